@@ -52,11 +52,19 @@ def send_welcome_email_task(user_id):
 
 @shared_task
 def cleanup_expired_tokens():
-    """Clean up expired password reset tokens."""
+    """Clean up expired password reset tokens and refresh tokens."""
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+    from utils.deletion import delete_in_chunks
     from .models import User
+
     expired = User.objects.filter(
         password_reset_expires__lt=timezone.now(),
         password_reset_token__gt='',
     )
     count = expired.update(password_reset_token='', password_reset_expires=None)
     logger.info(f'Cleaned up {count} expired password reset tokens')
+
+    # Rotated refresh tokens are recorded on every refresh; drop expired
+    # ones (and their blacklist entries) in small batches.
+    deleted = delete_in_chunks(OutstandingToken.objects.filter(expires_at__lt=timezone.now()))
+    logger.info(f'Deleted {deleted} expired refresh tokens')
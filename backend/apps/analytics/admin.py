@@ -3,7 +3,7 @@ Admin configuration for the analytics app.
 """
 
 from django.contrib import admin
-from .models import AuditLog, PageView
+from .models import AuditLog, PageView, PageViewRollup
 
 
 @admin.register(AuditLog)
@@ -40,3 +40,18 @@ class PageViewAdmin(admin.ModelAdmin):
 
     def has_change_permission(self, request, obj=None):
         return False
+
+
+@admin.register(PageViewRollup)
+class PageViewRollupAdmin(admin.ModelAdmin):
+    list_display = ('path', 'granularity', 'bucket_start', 'views', 'unique_visitors')
+    list_filter = ('granularity', 'bucket_start')
+    search_fields = ('path',)
+    date_hierarchy = 'bucket_start'
+    list_per_page = 100
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,121 @@
+"""
+Asynchronous audit logging.
+
+``record`` only appends an event to a write-behind buffer, so auditing
+costs the request a single RPUSH (or a deque append without Redis); the
+``flush_audit_logs`` task writes buffered events with bulk_create.
+Events are validated when recorded, and batches that fail to write are
+requeued or dead-lettered rather than discarded (see
+``utils.buffer.EventBuffer``).
+
+AuditContextMiddleware exposes the current request to signal handlers
+so model changes can be attributed to the acting user, IP address and
+user agent without threading the request through every call site.
+"""
+
+import contextvars
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from utils.buffer import EventBuffer
+from utils.validators import normalize_ip
+
+BUFFER_KEY = 'analytics:audit_logs'
+FLUSH_BATCH_SIZE = getattr(settings, 'AUDIT_LOG_FLUSH_BATCH_SIZE', 1000)
+LOCAL_BUFFER_SIZE = getattr(settings, 'AUDIT_LOG_LOCAL_BUFFER_SIZE', 10000)
+LOCAL_FLUSH_THRESHOLD = getattr(settings, 'AUDIT_LOG_LOCAL_FLUSH_THRESHOLD', 200)
+
+_current_request = contextvars.ContextVar('audit_request', default=None)
+
+
+def get_current_request():
+    return _current_request.get()
+
+
+def set_current_request(request):
+    """Bind ``request`` to the current context; returns a token for ``reset_current_request``."""
+    return _current_request.set(request)
+
+
+def reset_current_request(token):
+    _current_request.reset(token)
+
+
+def get_client_ip(request):
+    """Client IP address, or None if the forwarded value is not a valid address."""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return normalize_ip(x_forwarded_for.split(',')[0])
+    return normalize_ip(request.META.get('REMOTE_ADDR'))
+
+
+def _write(events):
+    from .models import AuditLog
+
+    audit_logs = [
+        AuditLog(
+            user_id=event.get('user_id'),
+            action=event['action'],
+            resource_type=event['resource_type'],
+            resource_id=event.get('resource_id', ''),
+            description=event.get('description', ''),
+            ip_address=event.get('ip_address'),
+            user_agent=event.get('user_agent', ''),
+            metadata=event.get('metadata'),
+            created_at=parse_datetime(event['created_at']) or timezone.now(),
+        )
+        for event in events
+    ]
+    AuditLog.objects.bulk_create(audit_logs, batch_size=FLUSH_BATCH_SIZE)
+    return len(audit_logs)
+
+
+buffer = EventBuffer(
+    BUFFER_KEY,
+    _write,
+    batch_size=FLUSH_BATCH_SIZE,
+    local_size=LOCAL_BUFFER_SIZE,
+    flush_threshold=LOCAL_FLUSH_THRESHOLD,
+)
+
+
+def record(action, resource_type, resource_id='', description='', user=None,
+           metadata=None, request=None):
+    """
+    Queue an audit log entry.
+
+    The user, IP address and user agent are taken from ``request`` (or the
+    request bound by AuditContextMiddleware) unless ``user`` is given.
+    """
+    request = request or get_current_request()
+    ip_address, user_agent = None, ''
+    if request is not None:
+        ip_address = get_client_ip(request)
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+        if user is None:
+            user = getattr(request, 'user', None)
+    user_id = user.pk if user is not None and user.is_authenticated else None
+
+    buffer.append({
+        'user_id': str(user_id) if user_id else None,
+        'action': action,
+        'resource_type': resource_type,
+        'resource_id': str(resource_id),
+        'description': description,
+        'ip_address': normalize_ip(ip_address),
+        'user_agent': user_agent,
+        'metadata': metadata,
+        'created_at': timezone.now().isoformat(),
+    })
+
+
+def flush_audit_logs(batch_size=FLUSH_BATCH_SIZE, max_batches=100):
+    """
+    Drain buffered audit events into the database.
+
+    Returns:
+        number of audit logs written
+    """
+    return buffer.flush(batch_size, max_batches)
@@ -0,0 +1,209 @@
+"""
+Per-user counters for dashboards and unread badges.
+
+Counts are kept in a Redis hash per user (``user_counters:<id>``) that is
+built from the database on first read and then adjusted by signal
+handlers as rows are created or deleted. Hashes expire after a day and
+``reconcile_user_counters`` rewrites live hashes periodically, so any
+drift is bounded. When the cache is not Redis, writes simply invalidate a
+cached dict and the next read recounts.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from utils.cache import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'user_counters:'
+COUNTER_TTL = 60 * 60 * 24
+
+CONSULTATIONS = 'consultations'
+FINANCIAL_PLANS = 'financial_plans'
+PORTFOLIOS = 'portfolios'
+DOCUMENTS = 'documents'
+UNREAD_NOTIFICATIONS = 'unread_notifications'
+FIELDS = (CONSULTATIONS, FINANCIAL_PLANS, PORTFOLIOS, DOCUMENTS, UNREAD_NOTIFICATIONS)
+
+# Increment only if the hash exists; a partial hash would hide the other
+# counters from the rebuild on the next read.
+_INCR_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+
+_SET_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+return nil
+"""
+
+
+def _counter_querysets():
+    from apps.consultations.models import Consultation
+    from apps.documents.models import Document
+    from apps.financial_planning.models import FinancialPlan
+    from apps.investments.models import Portfolio
+    from apps.notifications.models import Notification
+
+    return {
+        CONSULTATIONS: Consultation.objects.all(),
+        FINANCIAL_PLANS: FinancialPlan.objects.all(),
+        PORTFOLIOS: Portfolio.objects.all(),
+        DOCUMENTS: Document.objects.all(),
+        UNREAD_NOTIFICATIONS: Notification.objects.filter(is_read=False),
+    }
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def count_from_db(user_ids):
+    """Count every counter for a batch of users with one grouped query per table."""
+    counts = {str(user_id): dict.fromkeys(FIELDS, 0) for user_id in user_ids}
+    for field, queryset in _counter_querysets().items():
+        rows = (
+            queryset.filter(user_id__in=user_ids)
+            .order_by()
+            .values('user_id')
+            .annotate(total=Count('pk'))
+            .values_list('user_id', 'total')
+        )
+        for user_id, total in rows:
+            counts[str(user_id)][field] = total
+    return counts
+
+
+def _store(redis, user_counts):
+    pipe = redis.pipeline(transaction=False)
+    for user_id, values in user_counts.items():
+        pipe.hset(_key(user_id), mapping=values)
+        pipe.expire(_key(user_id), COUNTER_TTL)
+    pipe.execute()
+
+
+def get_counters(user_id):
+    """Return all counters for a user, rebuilding them from the database if missing."""
+    redis = get_redis_connection()
+    if redis is not None:
+        try:
+            values = redis.hgetall(_key(user_id))
+            if len(values) == len(FIELDS):
+                return {k.decode(): max(int(v), 0) for k, v in values.items()}
+            counts = count_from_db([user_id])
+            _store(redis, counts)
+            return counts[str(user_id)]
+        except Exception as e:
+            logger.warning(f'Redis unavailable for user counters: {e}')
+            return count_from_db([user_id])[str(user_id)]
+
+    values = cache.get(_key(user_id))
+    if values is None:
+        values = count_from_db([user_id])[str(user_id)]
+        cache.set(_key(user_id), values, COUNTER_TTL)
+    return values
+
+
+def get_counter(user_id, field):
+    return get_counters(user_id)[field]
+
+
+def increment(user_id, field, delta=1):
+    """Adjust one counter. No-op on Redis if the user's hash is not built yet."""
+    redis = get_redis_connection()
+    if redis is None:
+        cache.delete(_key(user_id))
+        return
+    try:
+        redis.eval(_INCR_IF_EXISTS, 1, _key(user_id), field, delta)
+    except Exception as e:
+        logger.warning(f'Failed to update user counter {field} for {user_id}: {e}')
+        invalidate(user_id)
+
+
+def increment_many(user_ids, field, delta=1):
+    """Adjust one counter for many users in a single pipeline."""
+    if not user_ids:
+        return
+    redis = get_redis_connection()
+    if redis is None:
+        cache.delete_many([_key(user_id) for user_id in user_ids])
+        return
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.eval(_INCR_IF_EXISTS, 1, _key(user_id), field, delta)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f'Failed to update user counter {field} for {len(user_ids)} users: {e}')
+        invalidate(*user_ids)
+
+
+def set_counter(user_id, field, value):
+    """Overwrite one counter (e.g. after a bulk update the signals cannot see)."""
+    redis = get_redis_connection()
+    if redis is None:
+        cache.delete(_key(user_id))
+        return
+    try:
+        redis.eval(_SET_IF_EXISTS, 1, _key(user_id), field, value)
+    except Exception as e:
+        logger.warning(f'Failed to set user counter {field} for {user_id}: {e}')
+        invalidate(user_id)
+
+
+def recount(user_id, field):
+    """Recount a single counter from the database."""
+    value = _counter_querysets()[field].filter(user_id=user_id).count()
+    set_counter(user_id, field, value)
+    return value
+
+
+def invalidate(*user_ids):
+    """Drop cached counters so the next read recounts from the database."""
+    keys = [_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    redis = get_redis_connection()
+    try:
+        if redis is not None:
+            redis.delete(*keys)
+        else:
+            cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f'Failed to invalidate user counters: {e}')
+
+
+def reconcile_user_counters(batch_size=500):
+    """
+    Rewrite every live counter hash from the database.
+
+    Only users that currently have a hash are touched (they are the ones
+    reading counters); each batch costs one grouped COUNT per table.
+
+    Returns:
+        number of users reconciled
+    """
+    redis = get_redis_connection()
+    if redis is None:
+        return 0
+
+    reconciled = 0
+    batch = []
+    for key in redis.scan_iter(match=f'{KEY_PREFIX}*', count=batch_size):
+        batch.append(key.decode()[len(KEY_PREFIX):])
+        if len(batch) >= batch_size:
+            _store(redis, count_from_db(batch))
+            reconciled += len(batch)
+            batch = []
+    if batch:
+        _store(redis, count_from_db(batch))
+        reconciled += len(batch)
+    return reconciled
@@ -0,0 +1,60 @@
+"""
+Streaming exports of analytics data.
+
+Rows are read with ``.iterator(chunk_size)`` (a server-side cursor on
+PostgreSQL) and encoded as they are yielded, so an export holds at most
+one chunk in memory regardless of its size.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+AUDIT_LOG_EXPORT_FIELDS = [
+    'id',
+    'created_at',
+    'user_id',
+    'user__email',
+    'action',
+    'resource_type',
+    'resource_id',
+    'description',
+    'ip_address',
+    'user_agent',
+    'metadata',
+]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, fields, chunk_size):
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in _rows(queryset, fields, chunk_size):
+        yield writer.writerow(
+            json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (dict, list)) else value
+            for value in row
+        )
+
+
+def stream_ndjson(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    for row in _rows(queryset, fields, chunk_size):
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
@@ -0,0 +1,72 @@
+"""
+Buffered page view ingestion.
+
+TrackPageViewView only appends a small JSON event to a buffer; the
+``flush_page_views`` task drains the buffer in batches and writes the rows
+with bulk_create. See ``utils.buffer.EventBuffer`` for how events are
+buffered with and without Redis, and what happens to batches that fail.
+
+Event fields are validated before they are buffered so that one bad
+event cannot fail a batch.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from utils.buffer import EventBuffer
+from utils.validators import normalize_ip
+
+BUFFER_KEY = 'analytics:page_views'
+FLUSH_BATCH_SIZE = getattr(settings, 'PAGE_VIEW_FLUSH_BATCH_SIZE', 1000)
+LOCAL_BUFFER_SIZE = getattr(settings, 'PAGE_VIEW_LOCAL_BUFFER_SIZE', 10000)
+LOCAL_FLUSH_THRESHOLD = getattr(settings, 'PAGE_VIEW_LOCAL_FLUSH_THRESHOLD', 200)
+
+
+def _write(events):
+    from .models import PageView
+
+    page_views = [
+        PageView(
+            path=event['path'],
+            user_id=event.get('user_id'),
+            ip_address=event.get('ip_address'),
+            user_agent=event.get('user_agent', ''),
+            referrer=event.get('referrer', ''),
+            created_at=parse_datetime(event['created_at']) or timezone.now(),
+        )
+        for event in events
+    ]
+    PageView.objects.bulk_create(page_views, batch_size=FLUSH_BATCH_SIZE)
+    return len(page_views)
+
+
+buffer = EventBuffer(
+    BUFFER_KEY,
+    _write,
+    batch_size=FLUSH_BATCH_SIZE,
+    local_size=LOCAL_BUFFER_SIZE,
+    flush_threshold=LOCAL_FLUSH_THRESHOLD,
+)
+
+
+def enqueue_page_view(path, user_id=None, ip_address=None, user_agent='', referrer=''):
+    """Append a page view event to the ingestion buffer."""
+    buffer.append({
+        'path': path[:500],
+        'user_id': str(user_id) if user_id else None,
+        'ip_address': normalize_ip(ip_address),
+        'user_agent': user_agent,
+        'referrer': referrer[:1000],
+        'created_at': timezone.now().isoformat(),
+    })
+
+
+def flush_page_views(batch_size=FLUSH_BATCH_SIZE, max_batches=100):
+    """
+    Drain buffered page views into the database.
+
+    Returns:
+        number of page views written
+    """
+    return buffer.flush(batch_size, max_batches)
@@ -0,0 +1,35 @@
+"""
+Pre-create monthly partitions for audit_logs and page_views.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions and optionally drop expired ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=partitions.MONTHS_AHEAD,
+            help='Number of future months to create partitions for.',
+        )
+        parser.add_argument(
+            '--drop-expired', action='store_true',
+            help='Also drop partitions older than the retention period.',
+        )
+
+    def handle(self, *args, **options):
+        for table in partitions.PARTITIONED_TABLES:
+            if not partitions.is_partitioned(table):
+                self.stdout.write(f'{table}: not partitioned, skipping')
+                continue
+
+            created = partitions.ensure_partitions(table, options['months_ahead'])
+            self.stdout.write(f'{table}: created {len(created)} partition(s)')
+            if options['drop_expired']:
+                dropped = partitions.drop_expired_partitions(table)
+                self.stdout.write(f'{table}: dropped {len(dropped)} expired partition(s)')
+
+        self.stdout.write(self.style.SUCCESS('Partitions are up to date.'))
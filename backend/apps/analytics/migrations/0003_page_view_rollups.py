@@ -0,0 +1,79 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:47
+
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0002_page_view_created_at_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PageViewRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("HOUR", "Hour"), ("DAY", "Day")], max_length=4
+                    ),
+                ),
+                ("path", models.CharField(max_length=500)),
+                ("bucket_start", models.DateTimeField()),
+                ("views", models.PositiveIntegerField(default=0)),
+                ("unique_visitors", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "page_view_rollups",
+                "ordering": ["-bucket_start"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("watermark", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "rollup_watermarks",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="pageview",
+            index=models.Index(
+                fields=["created_at"], name="page_views_created_5023bb_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pageviewrollup",
+            index=models.Index(
+                fields=["granularity", "bucket_start"],
+                name="page_view_r_granula_2912b3_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="pageviewrollup",
+            constraint=models.UniqueConstraint(
+                fields=("granularity", "path", "bucket_start"),
+                name="unique_page_view_rollup_bucket",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0003_page_view_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pageviewrollup",
+            name="visitor_sketch",
+            field=models.BinaryField(
+                default=bytes, help_text="Serialized HyperLogLog of visitors"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="pageviewrollup",
+            name="unique_visitors",
+            field=models.PositiveIntegerField(
+                default=0, help_text="HyperLogLog estimate"
+            ),
+        ),
+    ]
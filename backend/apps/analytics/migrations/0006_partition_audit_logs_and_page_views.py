@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+from django.db import migrations
+from django.db.migrations.exceptions import IrreversibleError
+
+TABLES = ['audit_logs', 'page_views']
+MONTHS_AHEAD = 3
+
+
+def _month_start(value):
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def _partition_table(schema_editor, table):
+    """
+    Convert a plain table into one range-partitioned by month on created_at.
+
+    Existing rows are copied into monthly partitions; a DEFAULT partition
+    catches rows for months whose partition has not been created yet.
+    The primary key becomes (id, created_at) because PostgreSQL requires
+    unique constraints to include the partition key; secondary indexes
+    and foreign keys are recreated on the partitioned table.
+    """
+    qn = schema_editor.quote_name
+    old = f'{table}_unpartitioned'
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN ("
+            "  SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+            [table, table],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT MIN(created_at) FROM {qn(table)}')
+        earliest = cursor.fetchone()[0]
+
+    schema_editor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(old)}')
+    schema_editor.execute(
+        f'CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE (created_at)'
+    )
+
+    current = _month_start(datetime.now(timezone.utc))
+    month = _month_start(earliest) if earliest else current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        schema_editor.execute(
+            f'CREATE TABLE {qn(f"{table}_p{month:%Y%m}")} PARTITION OF {qn(table)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [month, _add_months(month, 1)],
+        )
+        month = _add_months(month, 1)
+    schema_editor.execute(f'CREATE TABLE {qn(f"{table}_default")} PARTITION OF {qn(table)} DEFAULT')
+
+    schema_editor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(old)}')
+    schema_editor.execute(f'DROP TABLE {qn(old)}')
+
+    schema_editor.execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, created_at)')
+    for index_def in index_defs:
+        schema_editor.execute(index_def)
+    for name, definition in foreign_keys:
+        schema_editor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+
+
+def partition_tables(apps, schema_editor):
+    # Declarative partitioning is PostgreSQL only; elsewhere the tables stay plain
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        _partition_table(schema_editor, table)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    raise IrreversibleError(
+        'audit_logs and page_views cannot be converted back to plain tables automatically; '
+        'restore them from a backup taken before this migration.'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0005_audit_log_created_at_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -5,6 +5,7 @@ Models for the analytics app.
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
@@ -36,7 +37,7 @@ class AuditLog(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     metadata = models.JSONField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'audit_logs'
@@ -67,14 +68,67 @@ class PageView(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
     referrer = models.URLField(max_length=1000, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered events keep the time they were tracked
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'page_views'
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['path', '-created_at']),
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
         return f'{self.path} - {self.created_at}'
+
+
+class PageViewRollup(models.Model):
+    """Pre-aggregated page view counts per path and hour/day."""
+
+    class Granularity(models.TextChoices):
+        HOUR = 'HOUR', 'Hour'
+        DAY = 'DAY', 'Day'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    granularity = models.CharField(max_length=4, choices=Granularity.choices)
+    path = models.CharField(max_length=500)
+    bucket_start = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    unique_visitors = models.PositiveIntegerField(
+        default=0, help_text='HyperLogLog estimate'
+    )
+    visitor_sketch = models.BinaryField(
+        default=bytes, editable=False, help_text='Serialized HyperLogLog of visitors'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'page_view_rollups'
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'path', 'bucket_start'],
+                name='unique_page_view_rollup_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        return f'{self.path} - {self.granularity} {self.bucket_start}'
+
+
+class RollupWatermark(models.Model):
+    """End of the last fully aggregated period for an incremental rollup job."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    watermark = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'rollup_watermarks'
+
+    def __str__(self):
+        return f'{self.name} @ {self.watermark}'
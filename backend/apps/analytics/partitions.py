@@ -0,0 +1,225 @@
+"""
+Monthly range partitioning for append-only analytics tables.
+
+On PostgreSQL, ``audit_logs`` and ``page_views`` are partitioned by month
+on ``created_at`` (see migration 0006). Partitions are named
+``<table>_pYYYYMM``; ``ensure_partitions`` pre-creates a few months
+ahead. Rows for a month with no partition land in the ``<table>_default``
+DEFAULT partition instead of failing, and are moved out when that
+month's partition is created. Retention drops whole expired partitions,
+which is instant and leaves no bloat behind.
+
+On other databases the tables are plain tables: partition management is
+a no-op and retention falls back to deleting expired rows.
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from utils.deletion import delete_in_chunks
+
+logger = logging.getLogger(__name__)
+
+MONTHS_AHEAD = getattr(settings, 'ANALYTICS_PARTITION_MONTHS_AHEAD', 3)
+
+PARTITIONED_TABLES = {
+    'audit_logs': {
+        'model': 'analytics.AuditLog',
+        'retention_months': getattr(settings, 'AUDIT_LOG_RETENTION_MONTHS', 24),
+    },
+    'page_views': {
+        'model': 'analytics.PageView',
+        'retention_months': getattr(settings, 'PAGE_VIEW_RETENTION_MONTHS', 6),
+    },
+}
+
+
+def month_start(value):
+    """First instant (UTC) of the month containing ``value``."""
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def _partition_month(table, name):
+    """Parse the month back out of a partition name, or None if it is not ours."""
+    if not name.startswith(f'{table}_p'):
+        return None
+    try:
+        month = datetime.strptime(name[len(table) + 2:], '%Y%m')
+    except ValueError:
+        return None
+    return month.replace(tzinfo=dt_timezone.utc)
+
+
+def is_partitioned(table):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """Return ``{month: partition name}`` for the table's monthly partitions."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        month = _partition_month(table, name)
+        if month is not None:
+            months[month] = name
+    return months
+
+
+def ensure_default_partition(table):
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {qn(default_partition_name(table))} '
+            f'PARTITION OF {qn(table)} DEFAULT'
+        )
+
+
+def create_partition(table, month):
+    """
+    Create the partition for ``month``.
+
+    Partitions are created months ahead, so the DEFAULT partition normally
+    holds no rows for the new range and the partition is simply added.
+    PostgreSQL refuses to add it while DEFAULT does hold such rows; only
+    then is DEFAULT detached (an ACCESS EXCLUSIVE lock on the table), the
+    month's rows moved into the new partition and DEFAULT reattached.
+    """
+    qn = connection.ops.quote_name
+    start, end = month_start(month), add_months(month_start(month), 1)
+    default = qn(default_partition_name(table))
+    create_sql = (
+        f'CREATE TABLE IF NOT EXISTS {qn(partition_name(table, start))} '
+        f'PARTITION OF {qn(table)} FOR VALUES FROM (%s) TO (%s)'
+    )
+    ensure_default_partition(table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= %s AND created_at < %s)',
+            [start, end],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(create_sql, [start, end])
+            return
+
+        logger.warning(f'Moving {table} rows for {start:%Y-%m} out of the default partition')
+        cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {default}')
+        cursor.execute(create_sql, [start, end])
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default} WHERE created_at >= %s AND created_at < %s '
+            f'RETURNING *) INSERT INTO {qn(table)} SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {default} DEFAULT')
+
+
+def ensure_partitions(table, months_ahead=MONTHS_AHEAD, start=None, now=None):
+    """
+    Create any missing monthly partitions from ``start`` (default: this
+    month) through ``months_ahead`` months in the future.
+
+    Returns:
+        names of the partitions created
+    """
+    if not is_partitioned(table):
+        return []
+
+    ensure_default_partition(table)
+    current = month_start(now or timezone.now())
+    month = month_start(start) if start else current
+    last = add_months(current, months_ahead)
+    existing = list_partitions(table)
+
+    created = []
+    while month <= last:
+        if month not in existing:
+            create_partition(table, month)
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    if created:
+        logger.info(f'Created partitions {", ".join(created)}')
+    return created
+
+
+def retention_cutoff(table, now=None):
+    """Rows created before this instant have expired."""
+    months = PARTITIONED_TABLES[table]['retention_months']
+    return add_months(month_start(now or timezone.now()), -months)
+
+
+def drop_expired_partitions(table, now=None):
+    """
+    Drop partitions that lie entirely before the table's retention cutoff
+    and delete expired rows that landed in the DEFAULT partition.
+
+    Without partitioning, expired rows are deleted instead.
+
+    Returns:
+        names of the partitions dropped (or the number of rows deleted)
+    """
+    cutoff = retention_cutoff(table, now)
+
+    if not is_partitioned(table):
+        model = apps.get_model(PARTITIONED_TABLES[table]['model'])
+        return delete_in_chunks(model.objects.filter(created_at__lt=cutoff))
+
+    qn = connection.ops.quote_name
+    dropped = []
+    for month, name in sorted(list_partitions(table).items()):
+        if add_months(month, 1) > cutoff:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+            cursor.execute(f'DROP TABLE {qn(name)}')
+        dropped.append(name)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {qn(default_partition_name(table))} WHERE created_at < %s', [cutoff]
+        )
+    if dropped:
+        logger.info(f'Dropped expired partitions {", ".join(dropped)}')
+    return dropped
+
+
+def maintain_partitions(months_ahead=MONTHS_AHEAD, now=None):
+    """Pre-create upcoming partitions and drop expired ones for every table."""
+    return {
+        table: {
+            'created': ensure_partitions(table, months_ahead, now=now),
+            'dropped': drop_expired_partitions(table, now=now),
+        }
+        for table in PARTITIONED_TABLES
+    }
@@ -0,0 +1,205 @@
+"""
+Incremental page view rollups.
+
+Raw page views are aggregated into hourly and daily PageViewRollup rows.
+Each granularity keeps a watermark (the end of the last aggregated bucket)
+and a run only processes buckets between the watermark and the last
+*complete* bucket, so every bucket is aggregated exactly once.
+
+Unique visitors are tracked with a HyperLogLog sketch stored on every
+rollup row. Hourly sketches are built in a single pass over that hour's
+raw rows; daily rows merge the day's hourly sketches and never touch raw
+page views. Sketches for any range of buckets or paths can be merged the
+same way with ``merge_sketches``.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import CharField, Min
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from utils.hyperloglog import HyperLogLog
+from .models import PageView, PageViewRollup, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+# Buffered page views reach the table a few seconds late; wait this long
+# after a bucket closes before aggregating it.
+LATE_ARRIVAL_GRACE = timedelta(minutes=5)
+
+HOURLY = 'page_views_hourly'
+DAILY = 'page_views_daily'
+
+ROLLUPS = {
+    PageViewRollup.Granularity.HOUR: {
+        'watermark': HOURLY,
+        'step': timedelta(hours=1),
+        'max_buckets_per_run': 48,
+    },
+    PageViewRollup.Granularity.DAY: {
+        'watermark': DAILY,
+        'step': timedelta(days=1),
+        'max_buckets_per_run': 7,
+    },
+}
+
+
+def visitor_expression():
+    """Identify a visitor by user id when logged in, otherwise by IP address."""
+    return Coalesce(Cast('user', CharField()), Cast('ip_address', CharField()))
+
+
+def floor_bucket(value, granularity):
+    """Start of the (local time) bucket containing ``value``."""
+    value = timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+    if granularity == PageViewRollup.Granularity.DAY:
+        value = value.replace(hour=0)
+    return value
+
+
+def merge_sketches(sketches):
+    """Merge serialized visitor sketches into one HyperLogLog."""
+    merged = HyperLogLog()
+    for data in sketches:
+        if data:
+            merged.merge(HyperLogLog.from_bytes(data))
+    return merged
+
+
+def _hourly_rollups(bucket_start, bucket_end):
+    """Build hourly rollups from one pass over the bucket's raw rows."""
+    views = defaultdict(int)
+    sketches = defaultdict(HyperLogLog)
+    rows = (
+        PageView.objects.filter(created_at__gte=bucket_start, created_at__lt=bucket_end)
+        .annotate(visitor=visitor_expression())
+        .values_list('path', 'visitor')
+        .order_by()
+        .iterator(chunk_size=5000)
+    )
+    for path, visitor in rows:
+        views[path] += 1
+        if visitor:
+            sketches[path].add(visitor)
+
+    return [
+        PageViewRollup(
+            granularity=PageViewRollup.Granularity.HOUR,
+            path=path,
+            bucket_start=bucket_start,
+            views=count,
+            unique_visitors=sketches[path].count(),
+            visitor_sketch=sketches[path].to_bytes(),
+        )
+        for path, count in views.items()
+    ]
+
+
+def _daily_rollups(bucket_start, bucket_end):
+    """Build daily rollups by merging the day's hourly rollups."""
+    views = defaultdict(int)
+    sketches = defaultdict(HyperLogLog)
+    hourly = (
+        PageViewRollup.objects.filter(
+            granularity=PageViewRollup.Granularity.HOUR,
+            bucket_start__gte=bucket_start,
+            bucket_start__lt=bucket_end,
+        )
+        .values_list('path', 'views', 'visitor_sketch')
+        .order_by()
+        .iterator(chunk_size=2000)
+    )
+    for path, count, sketch in hourly:
+        views[path] += count
+        if sketch:
+            sketches[path].merge(HyperLogLog.from_bytes(sketch))
+
+    return [
+        PageViewRollup(
+            granularity=PageViewRollup.Granularity.DAY,
+            path=path,
+            bucket_start=bucket_start,
+            views=count,
+            unique_visitors=sketches[path].count(),
+            visitor_sketch=sketches[path].to_bytes(),
+        )
+        for path, count in views.items()
+    ]
+
+
+BUILDERS = {
+    PageViewRollup.Granularity.HOUR: _hourly_rollups,
+    PageViewRollup.Granularity.DAY: _daily_rollups,
+}
+
+
+def _initial_watermark(granularity):
+    earliest = PageView.objects.aggregate(earliest=Min('created_at'))['earliest']
+    return floor_bucket(earliest, granularity) if earliest else None
+
+
+def _watermark(name):
+    state = RollupWatermark.objects.filter(name=name).first()
+    return state.watermark if state else None
+
+
+def rollup(granularity, now=None):
+    """
+    Aggregate complete buckets of one granularity since its watermark.
+
+    Returns:
+        number of rollup rows written
+    """
+    config = ROLLUPS[granularity]
+    now = now or timezone.now()
+
+    start = _watermark(config['watermark']) or _initial_watermark(granularity)
+    if start is None:
+        return 0
+
+    end = floor_bucket(now - LATE_ARRIVAL_GRACE, granularity)
+    if granularity == PageViewRollup.Granularity.DAY:
+        # Days are built from hourly rollups, so wait for those first
+        hourly_watermark = _watermark(HOURLY)
+        if hourly_watermark is None:
+            return 0
+        end = min(end, floor_bucket(hourly_watermark, granularity))
+
+    written = 0
+    bucket_start = timezone.localtime(start)
+    for _ in range(config['max_buckets_per_run']):
+        bucket_end = bucket_start + config['step']
+        if bucket_end > end:
+            break
+        rollups = BUILDERS[granularity](bucket_start, bucket_end)
+        with transaction.atomic():
+            PageViewRollup.objects.bulk_create(
+                rollups,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['granularity', 'path', 'bucket_start'],
+                update_fields=['views', 'unique_visitors', 'visitor_sketch', 'updated_at'],
+            )
+            RollupWatermark.objects.update_or_create(
+                name=config['watermark'], defaults={'watermark': bucket_end},
+            )
+        written += len(rollups)
+        bucket_start = bucket_end
+
+    if written:
+        logger.info(
+            f'Rolled up {written} {granularity.lower()} page view buckets until {bucket_start}'
+        )
+    return written
+
+
+def rollup_page_views(now=None):
+    """Run the hourly and daily rollups."""
+    return {
+        granularity.lower(): rollup(granularity, now=now)
+        for granularity in ROLLUPS
+    }
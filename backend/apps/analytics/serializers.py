@@ -3,7 +3,7 @@ Serializers for the analytics app.
 """
 
 from rest_framework import serializers
-from .models import AuditLog, PageView
+from .models import AuditLog, PageView, PageViewRollup
 
 
 class AuditLogSerializer(serializers.ModelSerializer):
@@ -33,6 +33,70 @@ class PageViewSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class PageViewRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PageViewRollup
+        fields = ['path', 'granularity', 'bucket_start', 'views', 'unique_visitors']
+        read_only_fields = fields
+
+
+class AuditLogQuerySerializer(serializers.Serializer):
+    """Time window for audit log queries; bounds the partitions scanned."""
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError('start must be before end.')
+        return attrs
+
+
+class AuditLogExportQuerySerializer(AuditLogQuerySerializer):
+    export_format = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+
+
+class PageViewRollupQuerySerializer(serializers.Serializer):
+    """Query parameters for the page view rollup endpoints."""
+    granularity = serializers.ChoiceField(
+        choices=PageViewRollup.Granularity.choices,
+        default=PageViewRollup.Granularity.DAY,
+    )
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    path = serializers.CharField(required=False, max_length=500)
+    limit = serializers.IntegerField(default=10, min_value=1, max_value=100)
+
+
+class ConsultationTimeSeriesQuerySerializer(serializers.Serializer):
+    """Query parameters for the consultation time-series endpoint."""
+    interval = serializers.ChoiceField(choices=['day', 'week'], default='day')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    MAX_BUCKETS = 366
+    DEFAULT_BUCKETS = {'day': 30, 'week': 12}
+
+    def validate(self, attrs):
+        from django.utils import timezone
+        from .timeseries import INTERVALS
+
+        step = INTERVALS[attrs['interval']]['step']
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or end - step * (self.DEFAULT_BUCKETS[attrs['interval']] - 1)
+        if start > end:
+            raise serializers.ValidationError('start must not be after end.')
+        if (end - start) / step >= self.MAX_BUCKETS:
+            raise serializers.ValidationError(f'At most {self.MAX_BUCKETS} buckets per request.')
+        attrs['start'], attrs['end'] = start, end
+        return attrs
+
+
+class TopPageSerializer(serializers.Serializer):
+    path = serializers.CharField()
+    views = serializers.IntegerField()
+    unique_visitors = serializers.IntegerField(help_text='HyperLogLog estimate')
+
+
 class DashboardStatsSerializer(serializers.Serializer):
     """Serializer for dashboard statistics."""
     total_users = serializers.IntegerField()
@@ -0,0 +1,134 @@
+"""
+Signals keeping per-user counters in sync with row writes and auditing
+changes made through the API.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import audit, counters, timeseries
+from .models import AuditLog
+
+COUNTED_MODELS = {
+    'consultations.Consultation': counters.CONSULTATIONS,
+    'financial_planning.FinancialPlan': counters.FINANCIAL_PLANS,
+    'investments.Portfolio': counters.PORTFOLIOS,
+    'documents.Document': counters.DOCUMENTS,
+}
+
+
+def _adjust_on_commit(user_id, field, delta):
+    transaction.on_commit(lambda: counters.increment(user_id, field, delta))
+
+
+def _counted_created(field):
+    def handler(sender, instance, created, **kwargs):
+        if created and not kwargs.get('raw'):
+            _adjust_on_commit(instance.user_id, field, 1)
+    return handler
+
+
+def _counted_deleted(field):
+    def handler(sender, instance, **kwargs):
+        _adjust_on_commit(instance.user_id, field, -1)
+    return handler
+
+
+for model, field in COUNTED_MODELS.items():
+    post_save.connect(_counted_created(field), sender=model, weak=False,
+                      dispatch_uid=f'user_counters_created_{model}')
+    post_delete.connect(_counted_deleted(field), sender=model, weak=False,
+                        dispatch_uid=f'user_counters_deleted_{model}')
+
+
+@receiver(post_save, sender='notifications.Notification')
+def notification_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Track unread notifications; read-state changes reset the counter.
+
+    Deletes adjust the counter at their call sites instead: a post_delete
+    receiver would stop cleanup from using Django's fast delete.
+    """
+    if kwargs.get('raw'):
+        return
+    if created:
+        if not instance.is_read:
+            _adjust_on_commit(instance.user_id, counters.UNREAD_NOTIFICATIONS, 1)
+    elif update_fields is None or 'is_read' in update_fields:
+        # The previous read state is unknown here, so recount just this field
+        user_id = instance.user_id
+        transaction.on_commit(
+            lambda: counters.recount(user_id, counters.UNREAD_NOTIFICATIONS)
+        )
+
+
+@receiver(post_save, sender='consultations.Consultation')
+@receiver(post_delete, sender='consultations.Consultation')
+def invalidate_consultation_timeseries(sender, instance, **kwargs):
+    """
+    Drop cached time-series buckets for the consultation's request and
+    session dates. A rescheduled session's old date is left to expire.
+    """
+    if kwargs.get('raw') or instance.created_at is None:
+        return
+    transaction.on_commit(lambda: timeseries.invalidate_consultation(instance))
+
+
+# Models whose changes are audited, with the field linking them to their parent
+AUDITED_MODELS = {
+    'consultations.Consultation': None,
+    'documents.Document': None,
+    'financial_planning.FinancialPlan': None,
+    'financial_planning.FinancialGoal': 'plan_id',
+    'financial_planning.Income': 'plan_id',
+    'financial_planning.Expense': 'plan_id',
+    'financial_planning.Asset': 'plan_id',
+    'financial_planning.Liability': 'plan_id',
+    'investments.Portfolio': None,
+    'investments.Holding': 'portfolio_id',
+}
+
+
+def _audit_on_commit(action, instance, parent_field, metadata=None):
+    # Only changes made while serving a request are audited; background
+    # jobs such as price updates would otherwise flood the log.
+    request = audit.get_current_request()
+    if request is None:
+        return
+
+    metadata = dict(metadata or {})
+    if parent_field:
+        metadata[parent_field] = str(getattr(instance, parent_field))
+    resource_type = instance._meta.object_name
+    resource_id = instance.pk
+    description = f'{action.label} {instance._meta.verbose_name}'
+    transaction.on_commit(lambda: audit.record(
+        action, resource_type, resource_id, description,
+        metadata=metadata or None, request=request,
+    ))
+
+
+def _audited_saved(parent_field):
+    def handler(sender, instance, created, update_fields=None, **kwargs):
+        if kwargs.get('raw'):
+            return
+        if created:
+            _audit_on_commit(AuditLog.ActionType.CREATE, instance, parent_field)
+        else:
+            metadata = {'fields': sorted(update_fields)} if update_fields else None
+            _audit_on_commit(AuditLog.ActionType.UPDATE, instance, parent_field, metadata)
+    return handler
+
+
+def _audited_deleted(parent_field):
+    def handler(sender, instance, **kwargs):
+        _audit_on_commit(AuditLog.ActionType.DELETE, instance, parent_field)
+    return handler
+
+
+for model, parent_field in AUDITED_MODELS.items():
+    post_save.connect(_audited_saved(parent_field), sender=model, weak=False,
+                      dispatch_uid=f'audit_saved_{model}')
+    post_delete.connect(_audited_deleted(parent_field), sender=model, weak=False,
+                        dispatch_uid=f'audit_deleted_{model}')
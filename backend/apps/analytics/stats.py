@@ -0,0 +1,58 @@
+"""
+Cached aggregate statistics for the analytics endpoints.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from utils.cache import get_or_compute, set_computed
+
+DASHBOARD_STATS_KEY = 'analytics:dashboard_stats'
+DASHBOARD_STATS_TTL = 60  # seconds
+
+
+def compute_dashboard_stats():
+    """Compute admin dashboard stats with one conditional aggregate per table."""
+    from apps.accounts.models import User
+    from apps.consultations.models import Consultation
+    from apps.blog.models import BlogPost
+    from apps.contact.models import ContactMessage
+    from apps.careers.models import JobApplication
+
+    thirty_days_ago = timezone.now() - timedelta(days=30)
+
+    users = User.objects.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        recent_signups=Count('id', filter=Q(created_at__gte=thirty_days_ago)),
+    )
+    consultations = Consultation.objects.aggregate(
+        total_consultations=Count('id'),
+        pending_consultations=Count('id', filter=Q(status='PENDING')),
+    )
+    blog_posts = BlogPost.objects.aggregate(
+        total_blog_posts=Count('id', filter=Q(status='PUBLISHED')),
+    )
+    contact_messages = ContactMessage.objects.aggregate(
+        total_contact_messages=Count('id'),
+        new_contact_messages=Count('id', filter=Q(status='NEW')),
+    )
+    job_applications = JobApplication.objects.aggregate(
+        total_job_applications=Count('id'),
+    )
+
+    return {**users, **consultations, **blog_posts, **contact_messages, **job_applications}
+
+
+def get_dashboard_stats():
+    """Dashboard stats from the cache, recomputed at most once per TTL."""
+    return get_or_compute(DASHBOARD_STATS_KEY, compute_dashboard_stats, DASHBOARD_STATS_TTL)
+
+
+def refresh_dashboard_stats():
+    """Recompute and store dashboard stats so readers never wait."""
+    stats = compute_dashboard_stats()
+    set_computed(DASHBOARD_STATS_KEY, stats, DASHBOARD_STATS_TTL)
+    return stats
@@ -0,0 +1,65 @@
+"""
+Celery tasks for the analytics app.
+"""
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_page_views():
+    """Write buffered page view events to the database in batches."""
+    from .ingestion import flush_page_views as flush
+
+    count = flush()
+    if count:
+        logger.info(f'Flushed {count} buffered page views')
+    return count
+
+
+@shared_task(ignore_result=True)
+def flush_audit_logs():
+    """Write buffered audit events to the database in batches."""
+    from .audit import flush_audit_logs as flush
+
+    count = flush()
+    if count:
+        logger.info(f'Flushed {count} buffered audit logs')
+    return count
+
+
+@shared_task
+def rollup_page_views():
+    """Aggregate complete hours/days of page views into rollup rows."""
+    from .rollups import rollup_page_views as run_rollups
+
+    return run_rollups()
+
+
+@shared_task(ignore_result=True)
+def refresh_dashboard_stats():
+    """Keep the cached admin dashboard stats warm."""
+    from .stats import refresh_dashboard_stats as refresh
+
+    refresh()
+
+
+@shared_task
+def reconcile_user_counters():
+    """Rewrite cached per-user counters from the database to correct drift."""
+    from .counters import reconcile_user_counters as reconcile
+
+    count = reconcile()
+    if count:
+        logger.info(f'Reconciled counters for {count} users')
+    return count
+
+
+@shared_task
+def maintain_partitions():
+    """Pre-create upcoming monthly partitions and drop expired ones."""
+    from .partitions import maintain_partitions as maintain
+
+    return maintain()
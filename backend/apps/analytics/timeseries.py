@@ -0,0 +1,213 @@
+"""
+Consultation time-series analytics.
+
+Metrics are bucketed by day or week in the database (one grouped query
+per metric) and cached per bucket. Buckets that closed more than
+``SETTLE_PERIOD`` ago are cached for a day; recent buckets, whose
+consultations are still likely to change status, are cached briefly.
+Saving or deleting a consultation also drops the buckets it falls in
+(see ``invalidate_consultation``), since cohorts often convert long
+after they settle.
+
+Volume and conversion are cohort metrics keyed by ``created_at``: of the
+consultations requested in a bucket, how many have been scheduled (or
+completed since) and completed. Advisor load is keyed by
+``scheduled_date`` and counts non-cancelled sessions and minutes per
+advisor.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+CACHE_PREFIX = 'analytics:consultations'
+RECENT_BUCKET_TTL = 60
+SETTLED_BUCKET_TTL = 60 * 60 * 24
+SETTLE_PERIOD = timedelta(days=getattr(settings, 'CONSULTATION_ANALYTICS_SETTLE_DAYS', 7))
+
+DAY = 'day'
+WEEK = 'week'
+INTERVALS = {
+    DAY: {'step': timedelta(days=1), 'trunc': TruncDate},
+    WEEK: {'step': timedelta(weeks=1), 'trunc': TruncWeek},
+}
+
+
+def bucket_start(value, interval):
+    """Start date of the bucket containing ``value``; weeks start on Monday."""
+    if interval == WEEK:
+        return value - timedelta(days=value.weekday())
+    return value
+
+
+def bucket_range(start, end, interval):
+    """Bucket start dates covering ``start`` through ``end`` (inclusive)."""
+    step = INTERVALS[interval]['step']
+    bucket = bucket_start(start, interval)
+    buckets = []
+    while bucket <= end:
+        buckets.append(bucket)
+        bucket += step
+    return buckets
+
+
+def _aware(value):
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def _trunc(field, interval):
+    return INTERVALS[interval]['trunc'](field, output_field=DateField())
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _empty_bucket(bucket):
+    from apps.consultations.models import Consultation
+
+    return {
+        'bucket': bucket.isoformat(),
+        'volume': {
+            'total': 0,
+            'by_type': dict.fromkeys(Consultation.ConsultationType.values, 0),
+        },
+        'conversion': {
+            'requested': 0,
+            'scheduled': 0,
+            'completed': 0,
+            'cancelled': 0,
+            'scheduled_rate': 0.0,
+            'completion_rate': 0.0,
+        },
+        'advisor_load': [],
+    }
+
+
+def _compute_buckets(buckets, interval):
+    """Compute metrics for the given buckets with one grouped query per metric."""
+    from apps.consultations.models import Consultation
+
+    Status = Consultation.Status
+    results = {bucket: _empty_bucket(bucket) for bucket in buckets}
+    range_start = _aware(buckets[0])
+    range_end = _aware(buckets[-1] + INTERVALS[interval]['step'])
+
+    type_counts = {
+        f'type_{value}': Count('id', filter=Q(consultation_type=value))
+        for value in Consultation.ConsultationType.values
+    }
+    cohorts = (
+        Consultation.objects.filter(created_at__gte=range_start, created_at__lt=range_end)
+        .annotate(bucket=_trunc('created_at', interval))
+        .values('bucket')
+        .annotate(
+            total=Count('id'),
+            scheduled=Count('id', filter=Q(status__in=[Status.SCHEDULED, Status.COMPLETED])),
+            completed=Count('id', filter=Q(status=Status.COMPLETED)),
+            cancelled=Count('id', filter=Q(status=Status.CANCELLED)),
+            **type_counts,
+        )
+        .order_by()
+    )
+    for row in cohorts:
+        bucket = results.get(_as_date(row['bucket']))
+        if bucket is None:
+            continue
+        total = row['total']
+        bucket['volume'] = {
+            'total': total,
+            'by_type': {
+                value: row[f'type_{value}'] for value in Consultation.ConsultationType.values
+            },
+        }
+        bucket['conversion'] = {
+            'requested': total,
+            'scheduled': row['scheduled'],
+            'completed': row['completed'],
+            'cancelled': row['cancelled'],
+            'scheduled_rate': round(row['scheduled'] / total, 4) if total else 0.0,
+            'completion_rate': round(row['completed'] / total, 4) if total else 0.0,
+        }
+
+    load = (
+        Consultation.objects.filter(
+            advisor__isnull=False,
+            scheduled_date__gte=range_start,
+            scheduled_date__lt=range_end,
+        )
+        .exclude(status=Status.CANCELLED)
+        .annotate(bucket=_trunc('scheduled_date', interval))
+        .values('bucket', 'advisor_id', 'advisor__email')
+        .annotate(sessions=Count('id'), minutes=Sum('duration'))
+        .order_by('bucket', '-sessions')
+    )
+    for row in load:
+        bucket = results.get(_as_date(row['bucket']))
+        if bucket is None:
+            continue
+        bucket['advisor_load'].append({
+            'advisor_id': str(row['advisor_id']),
+            'advisor_email': row['advisor__email'],
+            'sessions': row['sessions'],
+            'minutes': row['minutes'] or 0,
+        })
+
+    return results
+
+
+def _cache_key(interval, bucket):
+    return f'{CACHE_PREFIX}:{interval}:{bucket.isoformat()}'
+
+
+def invalidate_consultation(consultation):
+    """Drop the cached buckets a consultation is counted in."""
+    dates = {timezone.localdate(consultation.created_at)}
+    if consultation.scheduled_date:
+        dates.add(timezone.localdate(consultation.scheduled_date))
+    cache.delete_many([
+        _cache_key(interval, bucket_start(value, interval))
+        for value in dates
+        for interval in INTERVALS
+    ])
+
+
+def consultation_timeseries(start, end, interval=DAY, now=None):
+    """
+    Return per-bucket consultation metrics from ``start`` to ``end`` (dates).
+
+    Cached buckets are served from the cache; the missing ones are
+    computed together in a single pass and cached.
+    """
+    buckets = bucket_range(start, end, interval)
+    if not buckets:
+        return []
+
+    keys = {bucket: _cache_key(interval, bucket) for bucket in buckets}
+    cached = cache.get_many(keys.values())
+    missing = [bucket for bucket in buckets if keys[bucket] not in cached]
+
+    if missing:
+        computed = _compute_buckets(missing, interval)
+        settled_before = timezone.localdate(now or timezone.now()) - SETTLE_PERIOD
+        step = INTERVALS[interval]['step']
+        settled = {
+            keys[bucket]: data for bucket, data in computed.items()
+            if bucket + step <= settled_before
+        }
+        recent = {
+            keys[bucket]: data for bucket, data in computed.items()
+            if keys[bucket] not in settled
+        }
+        if settled:
+            cache.set_many(settled, timeout=SETTLED_BUCKET_TTL)
+        if recent:
+            cache.set_many(recent, timeout=RECENT_BUCKET_TTL)
+        cached.update(settled)
+        cached.update(recent)
+
+    return [cached[keys[bucket]] for bucket in buckets]
@@ -10,7 +10,13 @@ app_name = 'analytics'
 urlpatterns = [
     path('dashboard/', views.DashboardStatsView.as_view(), name='dashboard-stats'),
     path('user/', views.UserAnalyticsView.as_view(), name='user-analytics'),
-    path('consultations/', views.ConsultationAnalyticsView.as_view(), name='consultation-analytics'),
+    path('consultations/', views.ConsultationAnalyticsView.as_view(),
+         name='consultation-analytics'),
+    path('consultations/timeseries/', views.ConsultationTimeSeriesView.as_view(),
+         name='consultation-timeseries'),
     path('audit-logs/', views.AuditLogListView.as_view(), name='audit-log-list'),
+    path('audit-logs/export/', views.AuditLogExportView.as_view(), name='audit-log-export'),
     path('track-page-view/', views.TrackPageViewView.as_view(), name='track-page-view'),
+    path('page-views/top/', views.TopPagesView.as_view(), name='page-view-top'),
+    path('page-views/trend/', views.PageViewTrendView.as_view(), name='page-view-trend'),
 ]
@@ -2,60 +2,53 @@
 Views for the analytics app.
 """
 
+from collections import defaultdict
 from datetime import timedelta
 
-from django.db.models import Count, Q
+from django.db.models import Count, Sum
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from drf_spectacular.utils import extend_schema
 
-from .models import AuditLog, PageView
+from . import audit, counters
+from .exports import AUDIT_LOG_EXPORT_FIELDS, EXPORT_FORMATS
+from .ingestion import enqueue_page_view
+from .models import AuditLog, PageViewRollup
+from .rollups import merge_sketches
+from .stats import get_dashboard_stats
+from .timeseries import consultation_timeseries
 from .serializers import (
+    AuditLogExportQuerySerializer,
+    AuditLogQuerySerializer,
     AuditLogSerializer,
+    ConsultationTimeSeriesQuerySerializer,
     DashboardStatsSerializer,
+    PageViewRollupQuerySerializer,
+    PageViewRollupSerializer,
+    TopPageSerializer,
     UserAnalyticsSerializer,
 )
+from utils.pagination import KeysetPagination
 from utils.permissions import IsAdminUser
 
+# Audit log listings default to this window when no start is given
+AUDIT_LOG_DEFAULT_WINDOW_DAYS = 30
+
 
 @extend_schema(
     tags=['Analytics'],
     responses={200: DashboardStatsSerializer}
 )
 class DashboardStatsView(APIView):
-    """Admin dashboard statistics."""
+    """Admin dashboard statistics (cached, refreshed in the background)."""
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        from apps.accounts.models import User
-        from apps.consultations.models import Consultation
-        from apps.blog.models import BlogPost
-        from apps.contact.models import ContactMessage
-        from apps.careers.models import JobApplication
-
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-
-        stats = {
-            'total_users': User.objects.count(),
-            'active_users': User.objects.filter(is_active=True).count(),
-            'total_consultations': Consultation.objects.count(),
-            'pending_consultations': Consultation.objects.filter(
-                status='PENDING'
-            ).count(),
-            'total_blog_posts': BlogPost.objects.filter(
-                status='PUBLISHED'
-            ).count(),
-            'total_contact_messages': ContactMessage.objects.count(),
-            'new_contact_messages': ContactMessage.objects.filter(
-                status='NEW'
-            ).count(),
-            'total_job_applications': JobApplication.objects.count(),
-            'recent_signups': User.objects.filter(
-                created_at__gte=thirty_days_ago
-            ).count(),
-        }
+        stats = get_dashboard_stats()
 
         serializer = DashboardStatsSerializer(stats)
         return Response(
@@ -73,22 +66,13 @@ class UserAnalyticsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-
-        from apps.consultations.models import Consultation
-        from apps.financial_planning.models import FinancialPlan
-        from apps.investments.models import Portfolio
-        from apps.documents.models import Document
-        from apps.notifications.models import Notification
-
+        values = counters.get_counters(request.user.id)
         data = {
-            'total_consultations': Consultation.objects.filter(user=user).count(),
-            'total_financial_plans': FinancialPlan.objects.filter(user=user).count(),
-            'total_portfolios': Portfolio.objects.filter(user=user).count(),
-            'total_documents': Document.objects.filter(user=user).count(),
-            'unread_notifications': Notification.objects.filter(
-                user=user, is_read=False
-            ).count(),
+            'total_consultations': values[counters.CONSULTATIONS],
+            'total_financial_plans': values[counters.FINANCIAL_PLANS],
+            'total_portfolios': values[counters.PORTFOLIOS],
+            'total_documents': values[counters.DOCUMENTS],
+            'unread_notifications': values[counters.UNREAD_NOTIFICATIONS],
         }
 
         serializer = UserAnalyticsSerializer(data)
@@ -140,6 +124,29 @@ class ConsultationAnalyticsView(APIView):
         )
 
 
+@extend_schema(
+    tags=['Analytics'],
+    parameters=[ConsultationTimeSeriesQuerySerializer],
+    responses={200: dict}
+)
+class ConsultationTimeSeriesView(APIView):
+    """Consultation volume, conversion and advisor load per day/week (admin only)."""
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        params = ConsultationTimeSeriesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = consultation_timeseries(
+            params.validated_data['start'],
+            params.validated_data['end'],
+            params.validated_data['interval'],
+        )
+        return Response(
+            {'success': True, 'data': data},
+            status=status.HTTP_200_OK,
+        )
+
+
 @extend_schema(tags=['Analytics'])
 class AuditLogListView(generics.ListAPIView):
     """List audit logs (admin only)."""
@@ -147,19 +154,146 @@ class AuditLogListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminUser]
     filterset_fields = ['action', 'resource_type', 'user']
     search_fields = ['description', 'resource_type']
-    ordering_fields = ['created_at']
+    # Newest first by (created_at, id); the paginator fixes the ordering
+    pagination_class = KeysetPagination
+    # Window used when no ``start`` is given; None means no lower bound
+    default_window = timedelta(days=AUDIT_LOG_DEFAULT_WINDOW_DAYS)
 
     def get_queryset(self):
-        return AuditLog.objects.select_related('user').all()
+        # Bound created_at so PostgreSQL only scans the matching monthly
+        # partitions instead of the whole history.
+        params = AuditLogQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        start = params.validated_data.get('start')
+        if start is None and self.default_window is not None:
+            start = timezone.now() - self.default_window
+        queryset = AuditLog.objects.select_related('user')
+        if start is not None:
+            queryset = queryset.filter(created_at__gte=start)
+        if params.validated_data.get('end'):
+            queryset = queryset.filter(created_at__lt=params.validated_data['end'])
+        return queryset
+
+
+@extend_schema(tags=['Analytics'], parameters=[AuditLogExportQuerySerializer])
+class AuditLogExportView(AuditLogListView):
+    """
+    Stream audit logs as CSV or NDJSON (admin only).
+
+    Accepts the same filters as the list endpoint and streams every
+    matching row instead of a page. Unlike the list, it has no default
+    window: without ``start`` the whole history is exported.
+    """
+    pagination_class = None
+    default_window = None
+
+    def get(self, request):
+        params = AuditLogExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        export_format = params.validated_data['export_format']
+        stream, content_type = EXPORT_FORMATS[export_format]
+
+        queryset = self.filter_queryset(self.get_queryset())
+        audit.record(
+            AuditLog.ActionType.EXPORT, 'AuditLog',
+            description=f'Exported audit logs as {export_format}',
+            metadata={'filters': request.query_params.dict()},
+            request=request,
+        )
+
+        response = StreamingHttpResponse(
+            stream(queryset, AUDIT_LOG_EXPORT_FIELDS), content_type=content_type,
+        )
+        filename = f'audit-logs-{timezone.now():%Y%m%d-%H%M%S}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+def _filtered_rollups(request):
+    """Validate rollup query params and return (rollup queryset, params)."""
+    params = PageViewRollupQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    data = params.validated_data
+
+    rollups = PageViewRollup.objects.filter(granularity=data['granularity'])
+    if data.get('start'):
+        rollups = rollups.filter(bucket_start__gte=data['start'])
+    if data.get('end'):
+        rollups = rollups.filter(bucket_start__lt=data['end'])
+    return rollups, data
+
+
+@extend_schema(
+    tags=['Analytics'],
+    parameters=[PageViewRollupQuerySerializer],
+    responses={200: TopPageSerializer(many=True)}
+)
+class TopPagesView(APIView):
+    """Most viewed paths over a period, read from page view rollups (admin only)."""
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        rollups, params = _filtered_rollups(request)
+        top_pages = list(
+            rollups.values('path')
+            .annotate(views=Sum('views'))
+            .order_by('-views')[:params['limit']]
+        )
+
+        # Merge each top path's visitor sketches across the whole range
+        sketches = defaultdict(list)
+        for path, sketch in rollups.filter(
+            path__in=[page['path'] for page in top_pages]
+        ).values_list('path', 'visitor_sketch'):
+            sketches[path].append(sketch)
+        for page in top_pages:
+            page['unique_visitors'] = merge_sketches(sketches[page['path']]).count()
+
+        serializer = TopPageSerializer(top_pages, many=True)
+        return Response(
+            {'success': True, 'data': serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
+
+@extend_schema(
+    tags=['Analytics'],
+    parameters=[PageViewRollupQuerySerializer],
+    responses={200: PageViewRollupSerializer(many=True)}
+)
+class PageViewTrendView(APIView):
+    """Views and unique visitors per hour/day for one path (admin only)."""
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        rollups, params = _filtered_rollups(request)
+        if not params.get('path'):
+            return Response(
+                {'success': False, 'message': 'Path is required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        trend = rollups.filter(path=params['path']).order_by('bucket_start')
+        serializer = PageViewRollupSerializer(trend, many=True)
+        return Response(
+            {'success': True, 'data': serializer.data},
+            status=status.HTTP_200_OK,
+        )
 
 
 @extend_schema(
     tags=['Analytics'],
     request={'application/json': {'type': 'object', 'properties': {'path': {'type': 'string'}}}},
-    responses={201: dict}
+    responses={202: dict}
 )
 class TrackPageViewView(APIView):
-    """Track a page view (public endpoint)."""
+    """
+    Track a page view (public endpoint).
+
+    The event is buffered and written in batches by the
+    ``flush_page_views`` task. Tokens are validated without loading the
+    user from the database.
+    """
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
@@ -170,9 +304,9 @@ class TrackPageViewView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        PageView.objects.create(
+        enqueue_page_view(
             path=path,
-            user=request.user if request.user.is_authenticated else None,
+            user_id=request.user.id if request.user.is_authenticated else None,
             ip_address=self.get_client_ip(request),
             user_agent=request.META.get('HTTP_USER_AGENT', ''),
             referrer=request.data.get('referrer', ''),
@@ -180,7 +314,7 @@ class TrackPageViewView(APIView):
 
         return Response(
             {'success': True, 'message': 'Page view tracked.'},
-            status=status.HTTP_201_CREATED,
+            status=status.HTTP_202_ACCEPTED,
         )
 
     def get_client_ip(self, request):
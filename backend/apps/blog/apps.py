@@ -5,3 +5,6 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.blog'
     verbose_name = 'Blog'
+
+    def ready(self):
+        import apps.blog.signals  # noqa: F401
@@ -0,0 +1,110 @@
+"""
+Response caching for the public blog endpoints.
+
+Public list and retrieve responses are cached per path and recognised
+query parameters (filters, search, ordering and page, in a normalised
+order; anything else, such as cache-busting parameters, shares the same
+entry) together with an ETag (a hash of the response body). Repeat
+requests are served from the cache and answered with 304 when the
+client's validators still match.
+
+Every entry key carries a generation: the time of the last change to
+posts, their tags or categories. A change bumps it once its transaction
+commits, which invalidates all cached responses at once without having
+to find them, and it doubles as the Last-Modified date of every
+response, since any change may alter any list (a post being
+unpublished, say, changes lists without touching a remaining post).
+"""
+
+import hashlib
+import json
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+KEY_PREFIX = 'blog:responses'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+RESPONSE_CACHE_TTL = 60 * 15
+
+
+def _generation():
+    """Time of the last invalidation, in microseconds."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns() // 1000, None)
+        generation = cache.get(GENERATION_KEY) or time.time_ns() // 1000
+    return generation
+
+
+def _bump_generation():
+    cache.set(GENERATION_KEY, time.time_ns() // 1000, None)
+
+
+def invalidate():
+    """Drop every cached blog response once the current transaction commits."""
+    transaction.on_commit(_bump_generation)
+
+
+def _key(request, generation, params):
+    query = urlencode(sorted(
+        (param, value)
+        for param in set(params)
+        for value in request.query_params.getlist(param)
+        if value
+    ))
+    location = hashlib.md5(f'{request.get_host()}{request.path}?{query}'.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{generation}:{location}'
+
+
+def _etag(data):
+    body = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+    return quote_etag(hashlib.md5(body.encode()).hexdigest())
+
+
+def cached_response(request, render, params=()):
+    """
+    Serve a GET from the cache, rendering and caching it on a miss.
+
+    Args:
+        request: the DRF request
+        render: callable returning the response; only 200 responses are
+            cached
+        params: query parameters that change the response; others are
+            left out of the cache key
+
+    Returns:
+        the cached response, or 304 if the client's copy is current
+    """
+    generation = _generation()
+    key = _key(request, generation, params)
+    entry = cache.get(key)
+    if entry is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+        entry = {
+            'data': response.data,
+            'etag': _etag(response.data),
+            # Rounded up so the header is never older than the change
+            'last_modified': -(-generation // 1_000_000),
+        }
+        cache.set(key, entry, RESPONSE_CACHE_TTL)
+
+    response = Response(entry['data'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    # Editors get a different (uncached) view of the same URLs
+    patch_vary_headers(response, ['Authorization'])
+    patch_cache_control(response, public=True, no_cache=True)
+    return get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=entry['last_modified'],
+        response=response,
+    )
@@ -0,0 +1,21 @@
+"""
+Filters for the blog app.
+"""
+
+from rest_framework.filters import SearchFilter
+
+from .search import search_posts
+
+
+class BlogPostSearchFilter(SearchFilter):
+    """
+    ``?search=`` over title, excerpt and content using the full-text index.
+
+    Results are ordered by relevance unless ``?ordering=`` is given.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').replace('\x00', '').strip()
+        if not query:
+            return queryset
+        return search_posts(queryset, query)
@@ -0,0 +1,55 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = 'blog_posts_fts'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX blog_posts_search_gin ON blog_posts USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            "UPDATE blog_posts SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'C')"
+        )
+    elif vendor == 'sqlite':
+        # Local fallback: an FTS5 mirror of the searchable fields
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            'post_id UNINDEXED, title, excerpt, content, '
+            "tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (post_id, title, excerpt, content) '
+            f'SELECT id, title, excerpt, content FROM blog_posts'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS blog_posts_search_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # GIN indexes and FTS5 tables are backend specific, so they live
+        # outside the model state
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0002_blog_post_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedPost",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_entries",
+                        to="blog.blogpost",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="blog.blogpost",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "blog_related_posts",
+                "ordering": ["post", "rank"],
+                "indexes": [
+                    models.Index(
+                        fields=["post", "rank"], name="blog_related_posts_rank_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="relatedpost",
+            constraint=models.UniqueConstraint(
+                fields=("post", "related"), name="blog_related_posts_unique"
+            ),
+        ),
+    ]
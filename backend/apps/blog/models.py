@@ -5,6 +5,7 @@ Models for the blog app.
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
 
@@ -84,6 +85,10 @@ class BlogPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Maintained by apps.blog.search; the GIN index on it is created in
+    # migration 0002 (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         db_table = 'blog_posts'
         ordering = ['-published_at']
@@ -99,3 +104,28 @@ class BlogPost(models.Model):
             word_count = len(self.content.split())
             self.read_time = max(1, round(word_count / 200))
         super().save(*args, **kwargs)
+
+
+class RelatedPost(models.Model):
+    """
+    Precomputed related-post recommendation (see apps.blog.related).
+
+    Each published post keeps its top matches, ranked from 1.
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = 'blog_related_posts'
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='blog_related_posts_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['post', 'rank'], name='blog_related_posts_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} -> {self.related_id} ({self.score:.3f})'
@@ -0,0 +1,284 @@
+"""
+Related-post recommendations.
+
+Each published post is scored against the other published posts it
+shares a tag, its category or one of its strongest terms with:
+
+    score = TAG_WEIGHT * jaccard(tags)
+          + CATEGORY_WEIGHT * same category
+          + TEXT_WEIGHT * cosine(TF-IDF of title, excerpt and content)
+
+and its top RELATED_POSTS_LIMIT matches are stored in ``RelatedPost``, so
+the detail page reads them with one indexed query. Posts sharing none of
+those only ever share weak terms and would score close to zero, so the
+inverted index keeps scoring roughly linear instead of comparing every
+pair.
+
+The term statistics of the corpus are kept in the cache. When a post is
+saved, published, unpublished or deleted, ``update_related_posts``
+updates that one post's entry and recomputes its own list and the lists
+of posts it enters or leaves; untouched lists are left alone. Updates
+hold a lock so concurrent saves cannot interleave. Other posts' vectors
+keep the document frequencies they were computed with and drift as
+posts change, so ``rebuild_related_posts`` recomputes everything nightly.
+"""
+
+import logging
+import math
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min
+
+logger = logging.getLogger(__name__)
+
+RELATED_POSTS_LIMIT = getattr(settings, 'BLOG_RELATED_POSTS_LIMIT', 5)
+TAG_WEIGHT = 0.4
+CATEGORY_WEIGHT = 0.2
+TEXT_WEIGHT = 0.4
+# Pairs scoring below this are never recommended
+MIN_SCORE = 0.05
+# Strongest terms per post used to find candidate matches
+INDEX_TERMS = 20
+
+CORPUS_KEY = 'blog:related:corpus'
+LOCK_KEY = 'blog:related:lock'
+LOCK_TIMEOUT = 60 * 5
+# Seconds an update waits for another one to finish
+LOCK_WAIT = 10
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset("""
+    a about after all also an and any are as at be because been but by can could
+    do does for from has have how if in into is it its just more most my no not
+    of on one or our out so some than that the their them then there these they
+    this to up us was we what when which who why will with you your
+""".split())
+
+
+class CorpusBusy(Exception):
+    """Another update of the related-post index is in progress."""
+
+
+def tokenize(text):
+    return [
+        token for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 2 and token not in STOP_WORDS
+    ]
+
+
+class Corpus:
+    """TF-IDF vectors, tags and categories of every published post."""
+
+    def __init__(self, posts=()):
+        self.posts = {post.pk: self._entry(post) for post in posts}
+        self.document_frequency = Counter()
+        for entry in self.posts.values():
+            self.document_frequency.update(entry['terms'].keys())
+        self.postings = defaultdict(set)
+        for pk in self.posts:
+            self._index(pk)
+
+    @staticmethod
+    def _entry(post):
+        return {
+            'category': post.category_id,
+            'tags': {tag.pk for tag in post.tags.all()},
+            'terms': Counter(tokenize(' '.join((post.title, post.excerpt, post.content)))),
+        }
+
+    def _vector(self, terms):
+        total = len(self.posts)
+        frequency = self.document_frequency
+        vector = {
+            term: (1 + math.log(count)) * math.log((1 + total) / (1 + frequency[term]))
+            for term, count in terms.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    @staticmethod
+    def _keys(entry):
+        """Inverted index keys of a post: its tags, category and strongest terms."""
+        keys = [('tag', tag) for tag in entry['tags']]
+        if entry['category'] is not None:
+            keys.append(('category', entry['category']))
+        strongest = sorted(entry['vector'].items(), key=lambda item: (-item[1], item[0]))
+        keys.extend(('term', term) for term, _ in strongest[:INDEX_TERMS])
+        return keys
+
+    def _index(self, pk):
+        entry = self.posts[pk]
+        entry['vector'] = self._vector(entry['terms'])
+        for key in self._keys(entry):
+            self.postings[key].add(pk)
+
+    def update(self, pk, post):
+        """Replace a post's entry, or remove it if ``post`` is None."""
+        entry = self.posts.pop(pk, None)
+        if entry is not None:
+            self.document_frequency.subtract(entry['terms'].keys())
+            self.document_frequency += Counter()
+            for key in self._keys(entry):
+                self.postings[key].discard(pk)
+                if not self.postings[key]:
+                    del self.postings[key]
+        if post is not None:
+            self.posts[pk] = self._entry(post)
+            self.document_frequency.update(self.posts[pk]['terms'].keys())
+            self._index(pk)
+
+    def candidates(self, pk):
+        """Posts sharing at least one index key with ``pk``."""
+        found = set()
+        for key in self._keys(self.posts[pk]):
+            found |= self.postings.get(key, set())
+        found.discard(pk)
+        return found
+
+    def score(self, a, b):
+        first, second = self.posts[a], self.posts[b]
+        score = 0.0
+        tags = first['tags'] | second['tags']
+        if tags:
+            score += TAG_WEIGHT * len(first['tags'] & second['tags']) / len(tags)
+        if first['category'] is not None and first['category'] == second['category']:
+            score += CATEGORY_WEIGHT
+        small, large = sorted((first['vector'], second['vector']), key=len)
+        score += TEXT_WEIGHT * sum(weight * large.get(term, 0.0) for term, weight in small.items())
+        return score
+
+    def top_related(self, pk, limit=RELATED_POSTS_LIMIT):
+        """Best ``(score, related_pk)`` matches for a post, highest first."""
+        scored = []
+        for other in self.candidates(pk):
+            score = self.score(pk, other)
+            if score >= MIN_SCORE:
+                scored.append((score, other))
+        scored.sort(key=lambda item: (-item[0], str(item[1])))
+        return scored[:limit]
+
+
+def _published_posts():
+    from .models import BlogPost
+
+    return (
+        BlogPost.objects.filter(status=BlogPost.Status.PUBLISHED)
+        .only('id', 'title', 'excerpt', 'content', 'category_id')
+        .prefetch_related('tags')
+    )
+
+
+def load_corpus():
+    """The cached corpus, built from the database on a cold cache."""
+    corpus = cache.get(CORPUS_KEY)
+    if corpus is None:
+        corpus = Corpus(_published_posts())
+        cache.set(CORPUS_KEY, corpus, None)
+    return corpus
+
+
+@contextmanager
+def _locked():
+    """Serialise changes to the corpus and the stored lists."""
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            raise CorpusBusy('Related posts are being updated by another worker')
+        time.sleep(0.1)
+    try:
+        yield
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _write(lists):
+    """Replace the stored lists for the given posts (``{pk: [(score, related_pk)]}``)."""
+    from .models import BlogPost, RelatedPost
+
+    # The cached corpus may briefly lag behind deletions
+    related = {related_pk for matches in lists.values() for _, related_pk in matches}
+    live = set(BlogPost.objects.filter(pk__in=related).values_list('pk', flat=True))
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=list(lists)).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=pk, related_id=related_pk, score=round(score, 6), rank=rank)
+            for pk, matches in lists.items()
+            for rank, (score, related_pk) in enumerate(
+                [match for match in matches if match[1] in live], start=1
+            )
+        ])
+
+
+def update_related_posts(post_id):
+    """
+    Refresh recommendations after a post changed.
+
+    Updates the post's corpus entry, recomputes its own list (or drops it
+    if the post is no longer published) and every list the post appeared
+    in or now qualifies for.
+
+    Raises:
+        CorpusBusy: if another update holds the lock for too long
+
+    Returns:
+        number of lists rewritten
+    """
+    from .models import RelatedPost
+
+    post_id = uuid.UUID(str(post_id))
+    with _locked():
+        corpus = load_corpus()
+        corpus.update(post_id, _published_posts().filter(pk=post_id).first())
+
+        affected = {post_id}
+        affected.update(
+            RelatedPost.objects.filter(related_id=post_id).values_list('post_id', flat=True)
+        )
+        if post_id in corpus.posts:
+            candidates = corpus.candidates(post_id) - affected
+            rows = (
+                RelatedPost.objects.filter(post_id__in=candidates)
+                .values('post_id')
+                .annotate(entries=Count('id'), weakest=Min('score'))
+                .order_by()
+            )
+            stored = {row['post_id']: row for row in rows}
+            for pk in candidates:
+                score = corpus.score(pk, post_id)
+                if score < MIN_SCORE:
+                    continue
+                row = stored.get(pk)
+                if row is None or row['entries'] < RELATED_POSTS_LIMIT or score > row['weakest']:
+                    affected.add(pk)
+
+        lists = {pk: corpus.top_related(pk) if pk in corpus.posts else [] for pk in affected}
+        _write(lists)
+        cache.set(CORPUS_KEY, corpus, None)
+    return len(lists)
+
+
+def rebuild_related_posts():
+    """
+    Recompute the corpus and every post's recommendations from scratch.
+
+    Returns:
+        number of posts indexed
+    """
+    from .models import RelatedPost
+
+    with _locked():
+        corpus = Corpus(_published_posts())
+        lists = {pk: corpus.top_related(pk) for pk in corpus.posts}
+        with transaction.atomic():
+            RelatedPost.objects.exclude(post_id__in=list(lists)).delete()
+            _write(lists)
+        cache.set(CORPUS_KEY, corpus, None)
+    logger.info(f'Rebuilt related posts for {len(lists)} blog posts')
+    return len(lists)
@@ -0,0 +1,144 @@
+"""
+Full-text search for blog posts.
+
+On PostgreSQL each post carries a ``search_vector`` (title weighted A,
+excerpt B, content C) backed by a GIN index; queries are parsed with
+``websearch_to_tsquery``, ranked with ``ts_rank`` and highlighted with
+``ts_headline``.
+
+On SQLite (development and tests) the same fields are mirrored into an
+FTS5 table, ranked with ``bm25`` using matching column weights and
+highlighted with ``snippet``.
+
+The index is refreshed from a ``post_save`` signal whenever a post's
+text may have changed.
+"""
+
+from django.db import connection
+from django.db.models import CharField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'blog_posts_fts'
+INDEXED_FIELDS = ('title', 'excerpt', 'content')
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+# Words per snippet
+SNIPPET_WORDS = 30
+
+
+def _vendor():
+    return connection.vendor
+
+
+def _search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('excerpt', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def index_posts(post_ids):
+    """Refresh the search index for the given posts."""
+    from .models import BlogPost
+
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    vendor = _vendor()
+    if vendor == 'postgresql':
+        BlogPost.objects.filter(pk__in=post_ids).update(search_vector=_search_vector())
+    elif vendor == 'sqlite':
+        rows = BlogPost.objects.filter(pk__in=post_ids).values_list('pk', *INDEXED_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE post_id = %s',
+                [(post_id.hex,) for post_id in post_ids],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (post_id, title, excerpt, content) '
+                f'VALUES (%s, %s, %s, %s)',
+                [(pk.hex, *values) for pk, *values in rows],
+            )
+
+
+def unindex_posts(post_ids):
+    """Remove posts from the SQLite index (PostgreSQL vectors live on the row)."""
+    if _vendor() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE post_id = %s',
+            [(post_id.hex,) for post_id in post_ids],
+        )
+
+
+def _fts5_query(query):
+    """Quote each term so user input is never parsed as FTS5 syntax."""
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    return ' '.join(terms)
+
+
+def search_posts(queryset, query):
+    """
+    Filter ``queryset`` to posts matching ``query``, best matches first.
+
+    Matches are annotated with ``search_rank`` and ``search_snippet`` (a
+    content excerpt with the matched terms wrapped in ``<mark>``).
+    Unsupported databases fall back to a case-insensitive substring match.
+    """
+    vendor = _vendor()
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(
+                search_rank=SearchRank(F('search_vector'), search_query),
+                search_snippet=SearchHeadline(
+                    'content', search_query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    max_words=SNIPPET_WORDS,
+                    min_words=SNIPPET_WORDS // 2,
+                ),
+            )
+            .order_by('-search_rank', '-published_at')
+        )
+
+    if vendor == 'sqlite':
+        match = _fts5_query(query)
+        if not match:
+            return queryset
+        table = queryset.model._meta.db_table
+        matches = f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        lookup = f'{matches} AND {FTS_TABLE}.post_id = {table}.id'
+        return (
+            queryset.filter(pk__in=RawSQL(f'SELECT post_id {matches}', [match]))
+            .annotate(
+                # bm25 is lower-is-better; weights follow title > excerpt > content
+                search_rank=RawSQL(
+                    f'SELECT -bm25({FTS_TABLE}, 0, 10, 4, 1) {lookup}', [match],
+                    output_field=FloatField(),
+                ),
+                search_snippet=RawSQL(
+                    f"SELECT snippet({FTS_TABLE}, 3, %s, %s, '…', %s) {lookup}",
+                    [HIGHLIGHT_START, HIGHLIGHT_STOP, SNIPPET_WORDS, match],
+                    output_field=CharField(),
+                ),
+            )
+            .order_by('-search_rank', '-published_at')
+        )
+
+    condition = Q()
+    for field in INDEXED_FIELDS:
+        condition |= Q(**{f'{field}__icontains': query})
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0), search_snippet=Value(None, output_field=CharField()),
+    )
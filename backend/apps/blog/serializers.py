@@ -2,12 +2,14 @@
 Serializers for the blog app.
 """
 
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from .models import BlogPost, Category, Tag
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    posts_count = serializers.IntegerField(source='posts.count', read_only=True)
+    # Annotated by the list view (published posts only)
+    posts_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Category
@@ -15,18 +17,30 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class TagSerializer(serializers.ModelSerializer):
-    posts_count = serializers.IntegerField(source='posts.count', read_only=True)
+    # Annotated by the list view (published posts only)
+    posts_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Tag
         fields = ['id', 'name', 'slug', 'posts_count']
 
 
+class TagSummarySerializer(serializers.ModelSerializer):
+    """Tag as nested in posts, without counts."""
+
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'slug']
+
+
 class BlogPostListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for blog post listing."""
     author_name = serializers.CharField(source='author.full_name', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
+    tags = TagSummarySerializer(many=True, read_only=True)
+    # Only set on ?search= results
+    search_rank = serializers.FloatField(read_only=True, default=None)
+    search_snippet = serializers.CharField(read_only=True, default=None)
 
     class Meta:
         model = BlogPost
@@ -34,15 +48,24 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             'id', 'title', 'slug', 'excerpt', 'author_name',
             'category', 'category_name', 'tags', 'featured_image',
             'status', 'read_time', 'views', 'is_featured',
-            'published_at', 'created_at',
+            'published_at', 'created_at', 'search_rank', 'search_snippet',
         ]
 
 
+class RelatedPostSerializer(serializers.ModelSerializer):
+    """Post summary shown in related-post lists."""
+
+    class Meta:
+        model = BlogPost
+        fields = ['id', 'title', 'slug', 'excerpt', 'featured_image', 'read_time', 'published_at']
+
+
 class BlogPostDetailSerializer(serializers.ModelSerializer):
     """Full serializer for blog post detail."""
     author_name = serializers.CharField(source='author.full_name', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
+    tags = TagSummarySerializer(many=True, read_only=True)
+    related_posts = serializers.SerializerMethodField()
 
     class Meta:
         model = BlogPost
@@ -51,9 +74,23 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
             'author', 'author_name', 'category', 'category_name',
             'tags', 'featured_image', 'status', 'read_time', 'views',
             'is_featured', 'published_at', 'created_at', 'updated_at',
+            'related_posts',
         ]
         read_only_fields = ['id', 'author', 'views', 'created_at', 'updated_at']
 
+    @extend_schema_field(RelatedPostSerializer(many=True))
+    def get_related_posts(self, obj):
+        """Precomputed recommendations, read with one indexed query."""
+        entries = (
+            obj.related_entries
+            .filter(related__status=BlogPost.Status.PUBLISHED)
+            .select_related('related')
+            .order_by('rank')
+        )
+        return RelatedPostSerializer(
+            [entry.related for entry in entries], many=True, context=self.context
+        ).data
+
 
 class BlogPostCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating blog posts (admin/advisor)."""
@@ -74,7 +111,10 @@ class BlogPostCreateSerializer(serializers.ModelSerializer):
 
         # Auto-set published_at when status is PUBLISHED
         from django.utils import timezone
-        if validated_data.get('status') == BlogPost.Status.PUBLISHED and not validated_data.get('published_at'):
+        if (
+            validated_data.get('status') == BlogPost.Status.PUBLISHED
+            and not validated_data.get('published_at')
+        ):
             validated_data['published_at'] = timezone.now()
 
         post = super().create(validated_data)
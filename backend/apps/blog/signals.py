@@ -0,0 +1,72 @@
+"""
+Signal handlers for the blog app.
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching, search, view_counts
+from .models import BlogPost, Category, Tag
+
+
+@receiver(post_save, sender=BlogPost)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    """Refresh the search index when a post's text may have changed."""
+    if update_fields is not None and not set(update_fields) & set(search.INDEXED_FIELDS):
+        return
+    search.index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=BlogPost)
+def unindex_post(sender, instance, **kwargs):
+    search.unindex_posts([instance.pk])
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def forget_published_slug(sender, instance, **kwargs):
+    """A post was published, unpublished or deleted."""
+    view_counts.forget_published(instance.slug)
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_cached_responses(sender, **kwargs):
+    """Drop cached public responses whenever anything they show changes."""
+    caching.invalidate()
+
+
+# Fields that feed related-post scores (tags are handled via m2m_changed)
+RELATED_FIELDS = {'title', 'excerpt', 'content', 'status', 'category'}
+
+
+def _schedule_related_update(post_id):
+    from .tasks import update_related_posts
+
+    transaction.on_commit(lambda: update_related_posts.delay(str(post_id)))
+
+
+@receiver(post_save, sender=BlogPost)
+def update_related_on_save(sender, instance, update_fields=None, **kwargs):
+    """Refresh related posts when a post is saved, published or unpublished."""
+    if update_fields is not None and not set(update_fields) & RELATED_FIELDS:
+        return
+    _schedule_related_update(instance.pk)
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_related_on_delete(sender, instance, **kwargs):
+    _schedule_related_update(instance.pk)
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def update_related_on_tags(sender, instance, action, reverse, **kwargs):
+    if reverse or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    _schedule_related_update(instance.pk)
@@ -0,0 +1,44 @@
+"""
+Celery tasks for the blog app.
+"""
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def flush_post_views():
+    """Write buffered blog post view counts to the database."""
+    from .view_counts import flush_views
+
+    count = flush_views()
+    if count:
+        logger.info(f'Flushed view counts for {count} blog posts')
+    return count
+
+
+@shared_task(bind=True, max_retries=3)
+def update_related_posts(self, post_id):
+    """Refresh related-post recommendations affected by a changed post."""
+    from .caching import invalidate
+    from .related import CorpusBusy, update_related_posts as update
+
+    try:
+        count = update(post_id)
+    except CorpusBusy as exc:
+        raise self.retry(exc=exc, countdown=30)
+    invalidate()
+    return count
+
+
+@shared_task
+def rebuild_related_posts():
+    """Recompute all related-post recommendations."""
+    from .caching import invalidate
+    from .related import rebuild_related_posts as rebuild
+
+    count = rebuild()
+    invalidate()
+    return count
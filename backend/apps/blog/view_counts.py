@@ -0,0 +1,188 @@
+"""
+Buffered blog post view counts.
+
+``record_view`` bumps a per-slug counter in a Redis hash instead of
+updating the post row, so concurrent readers of a popular post never
+queue on its row lock. Only slugs of published posts are counted (each
+slug's lookup is cached on its own), so the hash cannot be grown with
+arbitrary keys. ``flush_views`` periodically swaps the hash out and
+applies the pending counts with one UPDATE per slice of
+``FLUSH_SLICE_SIZE`` posts.
+
+Without Redis, counts are buffered in process memory. The periodic task
+runs in a Celery worker and cannot see them, so the web process flushes
+its own buffer from a background thread once it holds
+``LOCAL_FLUSH_THRESHOLD`` posts or its oldest count is
+``LOCAL_FLUSH_INTERVAL`` seconds old.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+
+from utils.cache import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+KEY = 'blog:views'
+PUBLISHED_KEY_PREFIX = 'blog:published'
+PUBLISHED_TTL = 60 * 5
+# Posts updated per UPDATE statement when flushing
+FLUSH_SLICE_SIZE = 500
+LOCAL_FLUSH_THRESHOLD = 200
+LOCAL_FLUSH_INTERVAL = 10
+
+_local = Counter()
+_local_lock = threading.Lock()
+_local_flush_lock = threading.Lock()
+_oldest_local = None
+
+
+def _published_key(slug):
+    return f'{PUBLISHED_KEY_PREFIX}:{hashlib.md5(slug.encode()).hexdigest()}'
+
+
+def is_published(slug):
+    """Whether a published post has ``slug``, cached per slug."""
+    from .models import BlogPost
+
+    key = _published_key(slug)
+    published = cache.get(key)
+    if published is None:
+        published = BlogPost.objects.filter(
+            slug=slug, status=BlogPost.Status.PUBLISHED
+        ).exists()
+        cache.set(key, published, PUBLISHED_TTL)
+    return published
+
+
+def forget_published(slug):
+    cache.delete(_published_key(slug))
+
+
+def record_view(slug):
+    """
+    Count one view of the post with ``slug``.
+
+    Returns:
+        False (counting nothing) if no published post has that slug
+    """
+    global _oldest_local
+
+    if not is_published(slug):
+        return False
+
+    redis = get_redis_connection()
+    if redis is not None:
+        try:
+            redis.hincrby(KEY, slug, 1)
+            return True
+        except Exception as e:
+            logger.warning(f'Redis unavailable for blog view counts, buffering locally: {e}')
+    now = time.monotonic()
+    with _local_lock:
+        if not _local:
+            _oldest_local = now
+        _local[slug] += 1
+        due = (
+            len(_local) >= LOCAL_FLUSH_THRESHOLD
+            or now - _oldest_local >= LOCAL_FLUSH_INTERVAL
+        )
+    if due and not _local_flush_lock.locked():
+        threading.Thread(target=_flush_local, daemon=True).start()
+    return True
+
+
+def _flush_local():
+    """Flush the in-process buffer from the process that owns it."""
+    if not _local_flush_lock.acquire(blocking=False):
+        return
+    try:
+        from django.db import connection
+        try:
+            flush_views()
+        finally:
+            connection.close()
+    except Exception as e:
+        logger.error(f'Failed to flush local blog view counts: {e}')
+    finally:
+        _local_flush_lock.release()
+
+
+def _take_pending():
+    """Atomically remove and return all pending counts as ``{slug: count}``."""
+    pending = Counter()
+    redis = get_redis_connection()
+    if redis is not None:
+        processing = f'{KEY}:flushing:{uuid.uuid4().hex}'
+        try:
+            # RENAME is atomic, so views recorded from here on land in a fresh hash
+            if redis.exists(KEY):
+                redis.rename(KEY, processing)
+                for slug, count in redis.hgetall(processing).items():
+                    pending[slug.decode()] += int(count)
+                redis.delete(processing)
+        except Exception as e:
+            logger.warning(f'Failed to read blog view counts from Redis: {e}')
+
+    with _local_lock:
+        pending.update(_local)
+        _local.clear()
+    return pending
+
+
+def _restore(pending):
+    """Put counts back after a failed flush so the next run retries them."""
+    redis = get_redis_connection()
+    if redis is not None:
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for slug, count in pending.items():
+                pipe.hincrby(KEY, slug, count)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f'Failed to restore blog view counts to Redis: {e}')
+    with _local_lock:
+        _local.update(pending)
+
+
+def flush_views():
+    """
+    Add pending view counts to ``BlogPost.views``.
+
+    Counts are applied ``FLUSH_SLICE_SIZE`` posts at a time so no single
+    UPDATE grows with the number of pending posts. If a slice fails, it
+    and every slice not yet applied are restored for the next run.
+    Counts for slugs that no longer exist are discarded.
+
+    Returns:
+        number of posts updated
+    """
+    from .models import BlogPost
+
+    pending = _take_pending()
+    items = sorted(pending.items())
+    updated = 0
+    for start in range(0, len(items), FLUSH_SLICE_SIZE):
+        chunk = items[start:start + FLUSH_SLICE_SIZE]
+        increment = Case(
+            *(When(slug=slug, then=Value(count)) for slug, count in chunk),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        try:
+            updated += BlogPost.objects.filter(
+                slug__in=[slug for slug, _ in chunk]
+            ).update(views=F('views') + increment)
+        except Exception as e:
+            logger.error(f'Failed to flush views for {len(items) - start} blog posts: {e}')
+            _restore(Counter(dict(items[start:])))
+            raise
+    return updated
@@ -2,13 +2,18 @@
 Views for the blog app.
 """
 
-from django.db.models import F
+from django.db.models import Count, Q
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema
 
+from .caching import cached_response
+from .filters import BlogPostSearchFilter
 from .models import BlogPost, Category, Tag
+from .view_counts import record_view
 from .serializers import (
     BlogPostListSerializer,
     BlogPostDetailSerializer,
@@ -24,11 +29,12 @@ class BlogPostViewSet(viewsets.ModelViewSet):
     """
     ViewSet for blog posts.
 
-    Public: list and retrieve published posts.
+    Public: list and retrieve published posts (cached, with ETag and
+    Last-Modified validators).
     Admin/Advisor: create, update, delete posts.
     """
+    filter_backends = [DjangoFilterBackend, BlogPostSearchFilter, OrderingFilter]
     filterset_fields = ['category__slug', 'status', 'is_featured']
-    search_fields = ['title', 'excerpt', 'content']
     ordering_fields = ['published_at', 'views', 'created_at']
     lookup_field = 'slug'
 
@@ -44,26 +50,73 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             return BlogPostCreateSerializer
         return BlogPostDetailSerializer
 
-    def get_queryset(self):
+    def is_editor(self):
         user = self.request.user
-        if user.is_authenticated and (user.is_staff or user.role in ('ADMIN', 'ADVISOR')):
+        return user.is_authenticated and (user.is_staff or user.role in ('ADMIN', 'ADVISOR'))
+
+    def get_queryset(self):
+        if self.is_editor():
             return BlogPost.objects.all().select_related('author', 'category').prefetch_related('tags')
         return BlogPost.objects.filter(
             status=BlogPost.Status.PUBLISHED
         ).select_related('author', 'category').prefetch_related('tags')
 
+    def cached_query_params(self):
+        """Query parameters that select what a public list shows."""
+        pagination = self.paginator
+        return [
+            *self.filterset_fields,
+            BlogPostSearchFilter.search_param,
+            OrderingFilter.ordering_param,
+            pagination.page_query_param,
+            pagination.page_size_query_param,
+        ]
+
+    def list(self, request, *args, **kwargs):
+        if self.is_editor():
+            return super().list(request, *args, **kwargs)
+
+        def render():
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return cached_response(request, render, self.cached_query_params())
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.is_editor():
+            return super().retrieve(request, *args, **kwargs)
+
+        def render():
+            post = self.get_object()
+            return Response(self.get_serializer(post).data)
+
+        return cached_response(request, render)
+
     @action(detail=True, methods=['post'], url_path='view')
     def increment_view(self, request, slug=None):
-        """Increment the view count for a post."""
-        post = self.get_object()
-        BlogPost.objects.filter(pk=post.pk).update(views=F('views') + 1)
+        """
+        Increment the view count for a post.
+
+        The view is buffered and applied by the ``flush_post_views``
+        task, so the post is not fetched or locked here; the slug is
+        checked against the cached set of published slugs instead.
+        """
+        if not record_view(slug):
+            return Response(
+                {'success': False, 'message': 'Blog post not found.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
         return Response({'success': True, 'message': 'View counted.'})
 
 
 @extend_schema(tags=['Blog'])
 class CategoryListView(generics.ListCreateAPIView):
     """List or create blog categories."""
-    queryset = Category.objects.all()
+    queryset = Category.objects.annotate(
+        posts_count=Count('posts', filter=Q(posts__status=BlogPost.Status.PUBLISHED))
+    )
     serializer_class = CategorySerializer
 
     def get_permissions(self):
@@ -75,7 +128,9 @@ class CategoryListView(generics.ListCreateAPIView):
 @extend_schema(tags=['Blog'])
 class TagListView(generics.ListCreateAPIView):
     """List or create blog tags."""
-    queryset = Tag.objects.all()
+    queryset = Tag.objects.annotate(
+        posts_count=Count('posts', filter=Q(posts__status=BlogPost.Status.PUBLISHED))
+    )
     serializer_class = TagSerializer
 
     def get_permissions(self):
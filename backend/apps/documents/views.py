@@ -9,6 +9,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 
+from apps.analytics import audit
+from apps.analytics.models import AuditLog
 from .models import Document
 from .serializers import (
     DocumentSerializer,
@@ -105,6 +107,10 @@ class DocumentDownloadView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        audit.record(
+            AuditLog.ActionType.DOWNLOAD, 'Document', doc.id,
+            f'Downloaded document {doc.title}', request=request,
+        )
         return FileResponse(
             doc.file.open('rb'),
             as_attachment=True,
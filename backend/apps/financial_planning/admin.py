@@ -3,7 +3,9 @@ Admin interface for the financial_planning app.
 """
 
 from django.contrib import admin
-from .models import FinancialPlan, FinancialGoal, Income, Expense, Asset, Liability
+from .models import (
+    FinancialPlan, FinancialGoal, Income, Expense, Asset, Liability, NetWorthSnapshot,
+)
 
 
 class FinancialGoalInline(admin.TabularInline):
@@ -39,3 +41,11 @@ class FinancialPlanAdmin(admin.ModelAdmin):
     search_fields = ['title', 'user__email', 'user__full_name']
     raw_id_fields = ['user', 'advisor']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(NetWorthSnapshot)
+class NetWorthSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['plan', 'snapshot_date', 'total_assets', 'total_liabilities', 'net_worth']
+    list_filter = ['snapshot_date']
+    raw_id_fields = ['plan']
+    date_hierarchy = 'snapshot_date'
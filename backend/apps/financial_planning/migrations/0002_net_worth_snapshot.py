@@ -0,0 +1,60 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:41
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financial_planning", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NetWorthSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("snapshot_date", models.DateField()),
+                ("total_income", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "total_expenses",
+                    models.DecimalField(decimal_places=2, max_digits=14),
+                ),
+                ("total_assets", models.DecimalField(decimal_places=2, max_digits=14)),
+                (
+                    "total_liabilities",
+                    models.DecimalField(decimal_places=2, max_digits=14),
+                ),
+                ("net_worth", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "plan",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="net_worth_history",
+                        to="financial_planning.financialplan",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "net_worth_snapshots",
+                "ordering": ["-snapshot_date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="networthsnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("plan", "snapshot_date"), name="unique_plan_snapshot_date"
+            ),
+        ),
+    ]
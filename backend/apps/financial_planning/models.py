@@ -3,9 +3,94 @@ Models for the financial_planning app.
 """
 
 import uuid
+from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
+from django.db.models import (
+    Case, Count, DecimalField, F, Func, IntegerField, OuterRef, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
+
+
+def _plan_sum(model, expression):
+    """Correlated subquery summing ``expression`` over a plan's related rows."""
+    output_field = DecimalField(max_digits=14, decimal_places=2)
+    subquery = (
+        model.objects.filter(plan=OuterRef('pk'))
+        .order_by()
+        .values('plan')
+        .annotate(total=Sum(expression, output_field=output_field))
+        .values('total')[:1]
+    )
+    return Coalesce(
+        Subquery(subquery, output_field=output_field),
+        Value(Decimal('0')),
+        output_field=output_field,
+    )
+
+
+def _plan_count(model):
+    """Correlated subquery counting a plan's related rows."""
+    subquery = (
+        model.objects.filter(plan=OuterRef('pk'))
+        .order_by()
+        .values('plan')
+        .annotate(total=Count('pk'))
+        .values('total')[:1]
+    )
+    return Coalesce(
+        Subquery(subquery, output_field=IntegerField()), Value(0), output_field=IntegerField()
+    )
+
+
+class _MonthlyFromAnnual(Func):
+    """``amount / 12`` as an exact decimal division on every backend."""
+    template = '(%(expressions)s / 12)'
+    output_field = DecimalField(max_digits=14, decimal_places=2)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite stores whole-number decimals as integers and would divide
+        # them as integers (and Django casts a Decimal('12') divisor back to
+        # an integer), so divide by a real instead.
+        return self.as_sql(compiler, connection, template='(%(expressions)s / 12.0)',
+                           **extra_context)
+
+
+def _monthly_amount(model):
+    """SQL equivalent of the ``monthly_amount`` property on Income/Expense."""
+    return Case(
+        When(frequency=model.Frequency.ANNUAL, then=_MonthlyFromAnnual(F('amount'))),
+        default=F('amount'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+class FinancialPlanQuerySet(models.QuerySet):
+
+    def with_totals(self):
+        """
+        Annotate plan totals computed in the database.
+
+        Each total is a correlated subquery, so the whole queryset is still
+        a single SELECT and related rows are never loaded into Python.
+        Annotations are named ``*_sum`` to avoid clashing with the
+        ``total_*`` properties on the model.
+        """
+        return self.annotate(
+            income_sum=_plan_sum(Income, _monthly_amount(Income)),
+            expense_sum=_plan_sum(Expense, _monthly_amount(Expense)),
+            asset_sum=_plan_sum(Asset, F('value')),
+            liability_sum=_plan_sum(Liability, F('amount')),
+        )
+
+    def with_counts(self):
+        """Annotate goal/income/expense counts without one COUNT per plan."""
+        return self.annotate(
+            goals_count=_plan_count(FinancialGoal),
+            incomes_count=_plan_count(Income),
+            expenses_count=_plan_count(Expense),
+        )
 
 
 class FinancialPlan(models.Model):
@@ -35,6 +120,8 @@ class FinancialPlan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = FinancialPlanQuerySet.as_manager()
+
     class Meta:
         db_table = 'financial_plans'
         ordering = ['-created_at']
@@ -230,3 +317,33 @@ class Liability(models.Model):
 
     def __str__(self):
         return f"{self.description}: {self.amount}"
+
+
+class NetWorthSnapshot(models.Model):
+    """Daily snapshot of a plan's totals, used for trend charts."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    plan = models.ForeignKey(
+        FinancialPlan, on_delete=models.CASCADE, related_name='net_worth_history'
+    )
+    snapshot_date = models.DateField()
+    total_income = models.DecimalField(max_digits=14, decimal_places=2)
+    total_expenses = models.DecimalField(max_digits=14, decimal_places=2)
+    total_assets = models.DecimalField(max_digits=14, decimal_places=2)
+    total_liabilities = models.DecimalField(max_digits=14, decimal_places=2)
+    net_worth = models.DecimalField(max_digits=14, decimal_places=2)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'net_worth_snapshots'
+        ordering = ['-snapshot_date']
+        constraints = [
+            # Also serves as the (plan, snapshot_date) index for range reads
+            models.UniqueConstraint(
+                fields=['plan', 'snapshot_date'], name='unique_plan_snapshot_date'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.plan.title} - {self.snapshot_date}"
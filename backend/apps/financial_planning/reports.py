@@ -0,0 +1,188 @@
+"""
+Financial plan report rendering (PDF and XLSX).
+"""
+
+import tempfile
+
+from django.core.files import File
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .calculators import project_investment_growth
+
+REPORT_FORMATS = ('pdf', 'xlsx')
+
+# Assumptions used for the projection section of every report
+PROJECTION_YEARS = 10
+PROJECTION_ANNUAL_RETURN = 8.0
+
+
+def build_plan_report(plan):
+    """
+    Collect the data shown in a plan report.
+
+    ``plan`` must come from ``FinancialPlan.objects.with_totals()`` so the
+    summary does not load every income/expense/asset/liability row.
+
+    Returns:
+        dict with summary, goals and projections sections
+    """
+    net_worth = plan.asset_sum - plan.liability_sum
+    monthly_surplus = plan.income_sum - plan.expense_sum
+
+    projection = project_investment_growth(
+        initial_investment=max(net_worth, 0),
+        monthly_contribution=max(monthly_surplus, 0),
+        annual_return=PROJECTION_ANNUAL_RETURN,
+        years=PROJECTION_YEARS,
+    )
+
+    return {
+        'title': plan.title,
+        'client': plan.user.full_name or plan.user.email,
+        'generated_at': timezone.now(),
+        'summary': [
+            ('Monthly income', plan.income_sum),
+            ('Monthly expenses', plan.expense_sum),
+            ('Monthly surplus', monthly_surplus),
+            ('Total assets', plan.asset_sum),
+            ('Total liabilities', plan.liability_sum),
+            ('Net worth', net_worth),
+        ],
+        'goals': [
+            (
+                goal.name,
+                goal.get_category_display(),
+                goal.target_amount,
+                goal.current_amount,
+                goal.progress_percentage,
+                goal.target_date,
+            )
+            for goal in plan.goals.all()
+        ],
+        'projections': [
+            (row['year'], row['total_invested'], row['returns'], row['balance'])
+            for row in projection['yearly_breakdown']
+        ],
+    }
+
+
+GOAL_HEADERS = ['Goal', 'Category', 'Target', 'Saved', 'Progress (%)', 'Target date']
+PROJECTION_HEADERS = ['Year', 'Invested', 'Returns', 'Balance']
+
+
+def render_pdf(report, fileobj):
+    """Render a report to PDF, writing directly into ``fileobj``."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    from xml.sax.saxutils import escape
+
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ])
+
+    def section(heading, headers, rows):
+        return [
+            Paragraph(heading, styles['Heading2']),
+            Table([headers] + [[str(value) for value in row] for row in rows],
+                  style=table_style, repeatRows=1),
+            Spacer(1, 12),
+        ]
+
+    story = [
+        # Paragraph parses its text as markup, so user input must be escaped
+        Paragraph(escape(report['title']), styles['Title']),
+        Paragraph(
+            f"Prepared for {escape(report['client'])} on "
+            f"{report['generated_at']:%Y-%m-%d}", styles['Normal'],
+        ),
+        Spacer(1, 12),
+    ]
+    story += section('Summary', ['Item', 'Amount'], report['summary'])
+    if report['goals']:
+        story += section('Goals', GOAL_HEADERS, report['goals'])
+    story += section(
+        f'{PROJECTION_YEARS}-year projection ({PROJECTION_ANNUAL_RETURN}% annual return)',
+        PROJECTION_HEADERS, report['projections'],
+    )
+
+    SimpleDocTemplate(fileobj, pagesize=A4, title=report['title']).build(story)
+
+
+def render_xlsx(report, fileobj):
+    """Render a report to XLSX using a write-only (streaming) workbook."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+
+    summary = workbook.create_sheet('Summary')
+    summary.append([report['title']])
+    summary.append(['Client', report['client']])
+    summary.append(['Generated', report['generated_at'].replace(tzinfo=None)])
+    summary.append([])
+    for label, amount in report['summary']:
+        summary.append([label, amount])
+
+    goals = workbook.create_sheet('Goals')
+    goals.append(GOAL_HEADERS)
+    for row in report['goals']:
+        goals.append(list(row))
+
+    projections = workbook.create_sheet('Projections')
+    projections.append(PROJECTION_HEADERS)
+    for row in report['projections']:
+        projections.append(list(row))
+
+    workbook.save(fileobj)
+
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'xlsx': render_xlsx,
+}
+
+
+def generate_plan_report(plan, report_format='pdf', requested_by=None):
+    """
+    Render a plan report and store it as a REPORT document for the plan owner.
+
+    The report is rendered into a temporary file on disk and handed to the
+    storage backend as a file object, so it is streamed to storage in
+    chunks rather than held in memory.
+
+    Returns:
+        the created Document
+    """
+    from apps.documents.models import Document
+
+    if report_format not in RENDERERS:
+        raise ValueError(f'Unsupported report format: {report_format}')
+
+    report = build_plan_report(plan)
+    extension = f'.{report_format}'
+    filename = f"{slugify(plan.title) or 'plan'}-{report['generated_at']:%Y%m%d}{extension}"
+
+    with tempfile.TemporaryFile() as tmp:
+        RENDERERS[report_format](report, tmp)
+        file_size = tmp.tell()
+        tmp.seek(0)
+
+        document = Document(
+            user=plan.user,
+            uploaded_by=requested_by,
+            title=f'{plan.title} report',
+            description=f'Financial plan report generated on {report["generated_at"]:%Y-%m-%d}.',
+            file_type=extension,
+            file_size=file_size,
+            category=Document.Category.REPORT,
+        )
+        document.file.save(filename, File(tmp), save=False)
+        document.save()
+
+    return document
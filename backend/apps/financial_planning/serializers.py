@@ -3,7 +3,9 @@ Serializers for the financial_planning app.
 """
 
 from rest_framework import serializers
-from .models import FinancialPlan, FinancialGoal, Income, Expense, Asset, Liability
+from .models import (
+    FinancialPlan, FinancialGoal, Income, Expense, Asset, Liability, NetWorthSnapshot,
+)
 
 
 class IncomeSerializer(serializers.ModelSerializer):
@@ -98,13 +100,26 @@ class FinancialPlanSerializer(serializers.ModelSerializer):
 
 
 class FinancialPlanListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for plan listing."""
-    goals_count = serializers.IntegerField(source='goals.count', read_only=True)
+    """
+    Lightweight serializer for plan listing.
+
+    Expects a queryset annotated with ``with_counts()`` and ``with_totals()``.
+    """
+    goals_count = serializers.IntegerField(read_only=True)
+    incomes_count = serializers.IntegerField(read_only=True)
+    expenses_count = serializers.IntegerField(read_only=True)
+    total_income = serializers.DecimalField(
+        source='income_sum', max_digits=14, decimal_places=2, read_only=True
+    )
+    total_expenses = serializers.DecimalField(
+        source='expense_sum', max_digits=14, decimal_places=2, read_only=True
+    )
 
     class Meta:
         model = FinancialPlan
         fields = [
             'id', 'title', 'description', 'status', 'goals_count',
+            'incomes_count', 'expenses_count', 'total_income', 'total_expenses',
             'created_at', 'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
@@ -120,6 +135,43 @@ class FinancialPlanCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class NetWorthSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NetWorthSnapshot
+        fields = ['snapshot_date', 'total_income', 'total_expenses', 'total_assets',
+                  'total_liabilities', 'net_worth']
+        read_only_fields = fields
+
+
+class NetWorthHistoryQuerySerializer(serializers.Serializer):
+    """Query parameters for the net worth history endpoint."""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    interval = serializers.ChoiceField(
+        choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')],
+        default='day',
+    )
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError('start must be on or before end.')
+        return attrs
+
+
+class PlanReportSerializer(serializers.Serializer):
+    """Request body for generating a plan report."""
+    format = serializers.ChoiceField(
+        choices=[('pdf', 'PDF'), ('xlsx', 'Excel')], default='pdf'
+    )
+
+
+class PlanReportBatchSerializer(PlanReportSerializer):
+    """Request body for generating reports for many plans at once."""
+    plan_ids = serializers.ListField(
+        child=serializers.UUIDField(), min_length=1, max_length=5000
+    )
+
+
 # ──── Calculator Serializers ────
 
 class CompoundInterestSerializer(serializers.Serializer):
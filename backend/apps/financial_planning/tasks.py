@@ -0,0 +1,114 @@
+"""
+Celery tasks for the financial_planning app.
+"""
+
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def snapshot_net_worth(batch_size=2000):
+    """
+    Record today's totals for every non-archived plan.
+
+    Totals come from one aggregated query over all plans, streamed with a
+    server-side cursor and written back with bulk_create. Re-running on the
+    same day is a no-op thanks to the (plan, snapshot_date) constraint.
+    """
+    from .models import FinancialPlan, NetWorthSnapshot
+
+    today = timezone.localdate()
+    rows = (
+        FinancialPlan.objects.exclude(status=FinancialPlan.Status.ARCHIVED)
+        .order_by()
+        .with_totals()
+        .values_list('id', 'income_sum', 'expense_sum', 'asset_sum', 'liability_sum')
+        .iterator(chunk_size=batch_size)
+    )
+
+    count = 0
+    batch = []
+    for plan_id, income, expenses, assets, liabilities in rows:
+        batch.append(NetWorthSnapshot(
+            plan_id=plan_id,
+            snapshot_date=today,
+            total_income=income,
+            total_expenses=expenses,
+            total_assets=assets,
+            total_liabilities=liabilities,
+            net_worth=assets - liabilities,
+        ))
+        if len(batch) >= batch_size:
+            NetWorthSnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+            count += len(batch)
+            batch = []
+
+    if batch:
+        NetWorthSnapshot.objects.bulk_create(batch, ignore_conflicts=True)
+        count += len(batch)
+
+    logger.info(f'Recorded net worth snapshots for {count} plans')
+    return count
+
+
+@shared_task(bind=True, max_retries=3)
+def generate_plan_report(self, plan_id, report_format='pdf', requested_by_id=None):
+    """Render a plan report, store it as a document and notify the plan owner."""
+    from .models import FinancialPlan
+    from .reports import REPORT_FORMATS, generate_plan_report as render_report
+    from apps.accounts.models import User
+    from apps.notifications.delivery import schedule_notification
+
+    if report_format not in REPORT_FORMATS:
+        logger.error(f'Unsupported report format {report_format!r} for plan {plan_id}')
+        return None
+
+    try:
+        plan = FinancialPlan.objects.with_totals().select_related('user').get(pk=plan_id)
+    except FinancialPlan.DoesNotExist:
+        logger.warning(f'Skipping report for missing plan {plan_id}')
+        return None
+
+    requested_by = None
+    if requested_by_id:
+        requested_by = User.objects.filter(pk=requested_by_id).first()
+
+    try:
+        document = render_report(plan, report_format, requested_by=requested_by)
+    except Exception as exc:
+        logger.error(f'Failed to generate report for plan {plan_id}: {exc}')
+        raise self.retry(exc=exc, countdown=60)
+
+    schedule_notification(
+        user_id=str(plan.user_id),
+        title='Your financial plan report is ready',
+        message=f'The {report_format.upper()} report for "{plan.title}" is now in your documents.',
+        notification_type='DOCUMENT',
+        data={'document_id': str(document.id), 'plan_id': str(plan.id)},
+        action_url='/dashboard/documents',
+    )
+    logger.info(f'Generated {report_format} report for plan {plan_id}')
+    return str(document.id)
+
+
+@shared_task
+def generate_plan_reports_batch(plan_ids, report_format='pdf', requested_by_id=None):
+    """
+    Fan a batch of plan reports out to the report worker pool.
+
+    Each plan is its own task, so one failing plan is retried on its own
+    without holding up (or dropping) the rest of the batch.
+    """
+    from celery import group
+
+    plan_ids = [str(plan_id) for plan_id in plan_ids]
+    if not plan_ids:
+        return 0
+    group(
+        generate_plan_report.s(plan_id, report_format, requested_by_id) for plan_id in plan_ids
+    ).apply_async(queue='reports')
+    logger.info(f'Queued {len(plan_ids)} {report_format} plan reports')
+    return len(plan_ids)
@@ -2,13 +2,19 @@
 Views for the financial_planning app.
 """
 
+from django.db.models import Avg, DateField
+from django.db.models.functions import Trunc
 from rest_framework import viewsets, permissions, status, generics
 from rest_framework.decorators import action
+from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 
-from .models import FinancialPlan, FinancialGoal, Income, Expense, Asset, Liability
+from .models import (
+    FinancialPlan, FinancialGoal, Income, Expense, Asset, Liability, NetWorthSnapshot,
+)
 from .serializers import (
     FinancialPlanSerializer,
     FinancialPlanListSerializer,
@@ -18,6 +24,10 @@ from .serializers import (
     ExpenseSerializer,
     AssetSerializer,
     LiabilitySerializer,
+    NetWorthSnapshotSerializer,
+    NetWorthHistoryQuerySerializer,
+    PlanReportSerializer,
+    PlanReportBatchSerializer,
     CompoundInterestSerializer,
     RetirementSerializer,
     LoanCalculatorSerializer,
@@ -31,7 +41,9 @@ from .calculators import (
     project_investment_growth,
     estimate_tax,
 )
-from utils.permissions import IsOwnerOrAdmin
+from .tasks import generate_plan_report, generate_plan_reports_batch
+from utils.pagination import KeysetPagination
+from utils.permissions import IsAdminUser, IsOwnerOrAdmin, IsAdvisor
 
 
 @extend_schema(tags=['Financial Plans'])
@@ -41,19 +53,28 @@ class FinancialPlanViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'title']
+    ordering = ['-created_at']
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'all_plans'):
             return FinancialPlanListSerializer
         if self.action == 'create':
             return FinancialPlanCreateSerializer
         return FinancialPlanSerializer
 
+    def _is_admin(self):
+        user = self.request.user
+        return user.is_staff or getattr(user, 'role', None) == 'ADMIN'
+
     def get_queryset(self):
         user = self.request.user
-        if user.is_staff or user.role == 'ADMIN':
-            return FinancialPlan.objects.all().select_related('user', 'advisor')
-        return FinancialPlan.objects.filter(user=user).select_related('user', 'advisor')
+        if self._is_admin():
+            queryset = FinancialPlan.objects.all()
+        else:
+            queryset = FinancialPlan.objects.filter(user=user)
+        if self.action in ('list', 'all_plans'):
+            return queryset.with_counts().with_totals()
+        return queryset.select_related('user', 'advisor')
 
     # ──── Nested CRUD for Goals ────
 
@@ -165,6 +186,111 @@ class FinancialPlanViewSet(viewsets.ModelViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    # ──── Net worth history ────
+
+    @action(detail=True, methods=['get'], url_path='net-worth-history')
+    def net_worth_history(self, request, pk=None):
+        """
+        Net worth snapshots for a plan, optionally limited to a date range
+        and downsampled to weekly or monthly averages.
+        """
+        plan = self.get_object()
+        params = NetWorthHistoryQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start = params.validated_data.get('start')
+        end = params.validated_data.get('end')
+        interval = params.validated_data['interval']
+
+        history = NetWorthSnapshot.objects.filter(plan=plan)
+        if start:
+            history = history.filter(snapshot_date__gte=start)
+        if end:
+            history = history.filter(snapshot_date__lte=end)
+
+        history = history.order_by('snapshot_date')
+        if interval != 'day':
+            totals = ['total_income', 'total_expenses', 'total_assets',
+                      'total_liabilities', 'net_worth']
+            buckets = (
+                history.annotate(bucket=Trunc('snapshot_date', interval, output_field=DateField()))
+                .values('bucket')
+                .annotate(**{f'avg_{name}': Avg(name) for name in totals})
+                .order_by('bucket')
+            )
+            history = [
+                {'snapshot_date': row['bucket'], **{name: row[f'avg_{name}'] for name in totals}}
+                for row in buckets
+            ]
+
+        serializer = NetWorthSnapshotSerializer(history, many=True)
+        return Response({'success': True, 'data': serializer.data})
+
+    # ──── Reports ────
+
+    @action(detail=True, methods=['post'], url_path='report')
+    def report(self, request, pk=None):
+        """Queue a PDF/XLSX report for this plan; the owner is notified when ready."""
+        plan = self.get_object()
+        serializer = PlanReportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = generate_plan_report.delay(
+            str(plan.id), serializer.validated_data['format'], str(request.user.id)
+        )
+        return Response(
+            {
+                'success': True,
+                'message': 'Report generation started.',
+                'data': {'task_id': result.id},
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @extend_schema(responses=FinancialPlanListSerializer(many=True))
+    @action(detail=False, methods=['get'], url_path='all',
+            permission_classes=[permissions.IsAuthenticated, IsAdminUser],
+            filter_backends=[DjangoFilterBackend, SearchFilter],
+            pagination_class=KeysetPagination)
+    def all_plans(self, request):
+        """
+        List every plan for admins, newest first.
+
+        Keyset pagination keeps deep pages as cheap as the first one, so
+        the order is fixed and ``ordering`` is rejected.
+        """
+        if 'ordering' in request.query_params:
+            return Response(
+                {'success': False, 'message': 'Ordering is not supported on this listing.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='reports/batch',
+            permission_classes=[permissions.IsAuthenticated, IsAdvisor])
+    def reports_batch(self, request):
+        """Queue reports for many plans (advisors: only plans they advise)."""
+        serializer = PlanReportBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        plans = FinancialPlan.objects.filter(id__in=serializer.validated_data['plan_ids'])
+        if not self._is_admin():
+            plans = plans.filter(advisor=request.user)
+        plan_ids = [str(plan_id) for plan_id in plans.values_list('id', flat=True)]
+
+        generate_plan_reports_batch.delay(
+            plan_ids, serializer.validated_data['format'], str(request.user.id)
+        )
+        return Response(
+            {
+                'success': True,
+                'message': f'Report generation started for {len(plan_ids)} plan(s).',
+                'data': {'queued': len(plan_ids)},
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
 
 # ──────────────────── Calculator Views ────────────────────
 
@@ -3,6 +3,8 @@ Admin configuration for the notifications app.
 """
 
 from django.contrib import admin
+
+from apps.analytics import counters
 from .models import Notification
 
 
@@ -20,8 +22,12 @@ class NotificationAdmin(admin.ModelAdmin):
     @admin.action(description='Mark selected notifications as read')
     def mark_as_read(self, request, queryset):
         from django.utils import timezone
+        user_ids = set(queryset.values_list('user_id', flat=True))
         queryset.update(is_read=True, read_at=timezone.now())
+        counters.invalidate(*user_ids)
 
     @admin.action(description='Mark selected notifications as unread')
     def mark_as_unread(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
         queryset.update(is_read=False, read_at=None)
+        counters.invalidate(*user_ids)
@@ -2,13 +2,45 @@
 WebSocket consumer for real-time notifications.
 """
 
+import asyncio
 import json
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
+
+from . import presence
+
+# Notifications arriving within this many seconds share one frame
+COALESCE_WINDOW = getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', 0.25)
+# Per-connection cap on notifications waiting to be sent; older ones are
+# dropped and reported as a count so the client can refetch the feed.
+MAX_PENDING = getattr(settings, 'NOTIFICATION_MAX_PENDING', 50)
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
-    """WebSocket consumer for real-time notifications."""
+    """
+    WebSocket consumer for real-time notifications.
+
+    Notifications are coalesced: everything that arrives within
+    COALESCE_WINDOW is sent as one frame::
+
+        {"type": "notifications", "notifications": [...],
+         "dropped": 0, "unread_count": 3}
+
+    While a frame is being written to a slow client, new notifications
+    keep queueing (up to MAX_PENDING, oldest dropped first) and go out in
+    the next frame, so bursts cost a bounded amount of memory and frames.
+
+    Each connection registers itself in the presence registry and
+    refreshes the registration every HEARTBEAT_INTERVAL seconds while it
+    stays open.
+    """
+
+    pending = None
+    dropped = 0
+    flush_task = None
+    heartbeat_task = None
 
     async def connect(self):
         self.user = self.scope.get('user')
@@ -19,6 +51,8 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         self.group_name = f'notifications_{self.user.id}'
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        await sync_to_async(presence.register)(self.user.id, self.channel_name)
+        self.heartbeat_task = asyncio.ensure_future(self.heartbeat())
 
         # Send unread count on connect
         unread_count = await self.get_unread_count()
@@ -28,9 +62,20 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         }))
 
     async def disconnect(self, close_code):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
         if hasattr(self, 'group_name'):
+            await sync_to_async(presence.unregister)(self.user.id, self.channel_name)
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
+    async def heartbeat(self):
+        """Keep this connection's presence registration from expiring."""
+        while True:
+            await asyncio.sleep(presence.HEARTBEAT_INTERVAL)
+            await sync_to_async(presence.register)(self.user.id, self.channel_name)
+
     async def receive(self, text_data):
         """Handle incoming messages from the client."""
         try:
@@ -61,18 +106,38 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             }))
 
     async def notification_message(self, event):
-        """Handle notification messages from the channel layer."""
-        await self.send(text_data=json.dumps({
-            'type': 'notification',
-            'notification': event['notification'],
-        }))
+        """Queue a notification from the channel layer for the next frame."""
+        if self.pending is None:
+            self.pending = []
+        self.pending.append(event['notification'])
+        if len(self.pending) > MAX_PENDING:
+            overflow = len(self.pending) - MAX_PENDING
+            del self.pending[:overflow]
+            self.dropped += overflow
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_pending())
+
+    async def flush_pending(self):
+        """Send queued notifications as one frame after the coalescing window."""
+        try:
+            await asyncio.sleep(COALESCE_WINDOW)
+            while self.pending:
+                notifications, dropped = self.pending, self.dropped
+                self.pending, self.dropped = [], 0
+                unread_count = await self.get_unread_count()
+                await self.send(text_data=json.dumps({
+                    'type': 'notifications',
+                    'notifications': notifications,
+                    'dropped': dropped,
+                    'unread_count': unread_count,
+                }))
+        finally:
+            self.flush_task = None
 
     @database_sync_to_async
     def get_unread_count(self):
-        from .models import Notification
-        return Notification.objects.filter(
-            user=self.user, is_read=False
-        ).count()
+        from apps.analytics import counters
+        return counters.get_counter(self.user.id, counters.UNREAD_NOTIFICATIONS)
 
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
@@ -88,7 +153,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def mark_all_read(self):
         from django.utils import timezone
+        from apps.analytics import counters
         from .models import Notification
         Notification.objects.filter(
             user=self.user, is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        counters.set_counter(self.user.id, counters.UNREAD_NOTIFICATIONS, 0)
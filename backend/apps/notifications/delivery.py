@@ -0,0 +1,111 @@
+"""
+Notification delivery scheduling.
+
+``schedule_notification`` is the entry point for sending a single
+notification. It:
+
+- drops duplicates: the same notification for the same user within
+  DEDUP_WINDOW seconds is only delivered once;
+- rate limits per user: past RATE_LIMIT notifications per RATE_WINDOW,
+  further deliveries are deferred to the next window (URGENT ones are
+  never deferred);
+- routes by priority to separate Celery queues, so urgent notifications
+  are served by their own workers and never wait behind bulk traffic
+  (including urgent broadcasts, which fan out on the bulk queue).
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+URGENT_QUEUE = 'notifications_urgent'
+DEFAULT_QUEUE = 'notifications'
+BULK_QUEUE = 'notifications_bulk'
+
+PRIORITY_QUEUES = {
+    'URGENT': URGENT_QUEUE,
+    'HIGH': DEFAULT_QUEUE,
+    'MEDIUM': DEFAULT_QUEUE,
+    'LOW': BULK_QUEUE,
+}
+
+DEDUP_WINDOW = getattr(settings, 'NOTIFICATION_DEDUP_WINDOW', 300)
+RATE_LIMIT = getattr(settings, 'NOTIFICATION_RATE_LIMIT', 20)
+RATE_WINDOW = getattr(settings, 'NOTIFICATION_RATE_WINDOW', 60)
+
+
+def queue_for(priority, bulk=False):
+    """
+    Celery queue for a priority.
+
+    Broadcast fan-out always goes to the bulk queue, whatever its
+    priority, so a large urgent broadcast never occupies the urgent
+    workers; the urgent queue is kept for single URGENT notifications.
+    """
+    if bulk:
+        return BULK_QUEUE
+    return PRIORITY_QUEUES.get(priority, DEFAULT_QUEUE)
+
+
+def _dedup_key(user_id, title, message, notification_type, data, action_url):
+    fingerprint = json.dumps(
+        [str(user_id), title, message, notification_type, data, action_url],
+        sort_keys=True, default=str,
+    )
+    return f'notifications:dedup:{hashlib.sha1(fingerprint.encode()).hexdigest()}'
+
+
+def _rate_limit_delay(user_id):
+    """Seconds to defer the user's next delivery, 0 if under the limit."""
+    key = f'notifications:rate:{user_id}'
+    cache.add(key, 0, RATE_WINDOW)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # The window expired between add and incr
+        cache.set(key, 1, RATE_WINDOW)
+        count = 1
+    if count <= RATE_LIMIT:
+        return 0
+    # Spread the overflow over the following windows
+    return RATE_WINDOW * ((count - 1) // RATE_LIMIT)
+
+
+def schedule_notification(user_id, title, message, notification_type='SYSTEM', priority='MEDIUM',
+                          data=None, action_url=''):
+    """
+    Queue a notification for delivery.
+
+    Returns:
+        the Celery AsyncResult, or None if it was dropped as a duplicate
+    """
+    from .tasks import send_notification
+
+    if not cache.add(
+        _dedup_key(user_id, title, message, notification_type, data, action_url), 1, DEDUP_WINDOW
+    ):
+        logger.info(f'Dropped duplicate notification "{title}" for user {user_id}')
+        return None
+
+    countdown = 0 if priority == 'URGENT' else _rate_limit_delay(user_id)
+    if countdown:
+        logger.info(f'Rate limited notifications for user {user_id}; deferring {countdown}s')
+
+    return send_notification.apply_async(
+        kwargs={
+            'user_id': str(user_id),
+            'title': title,
+            'message': message,
+            'notification_type': notification_type,
+            'priority': priority,
+            'data': data,
+            'action_url': action_url,
+        },
+        queue=queue_for(priority),
+        countdown=countdown or None,
+    )
@@ -0,0 +1,202 @@
+"""
+Email digests of unread notifications.
+
+One run walks every user with unread, not yet emailed notifications in
+streamed batches. Each batch costs a query for the notifications, a
+query for the recipients and one UPDATE marking what was sent; all
+emails of the run go out over a single SMTP connection. Emails are sent
+one at a time so a rejected recipient only leaves that user's
+notifications unmarked for the next run. Users who turned off
+``email_notifications`` are skipped.
+
+Urgent and high priority notifications for users who are offline are
+emailed right away by ``email_offline`` instead of waiting for the next
+digest.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.email import build_templated_email
+
+logger = logging.getLogger(__name__)
+
+DIGEST_BATCH_SIZE = getattr(settings, 'NOTIFICATION_DIGEST_BATCH_SIZE', 500)
+# Notifications listed per user; the rest are summarised as a count
+DIGEST_MAX_ITEMS = getattr(settings, 'NOTIFICATION_DIGEST_MAX_ITEMS', 20)
+
+PRIORITY_ORDER = ['URGENT', 'HIGH', 'MEDIUM', 'LOW']
+# Priorities emailed immediately when the user is offline
+IMMEDIATE_PRIORITIES = ('URGENT', 'HIGH')
+
+
+def _pending_notifications():
+    from .models import Notification
+
+    return Notification.objects.filter(
+        Q(user__preferences__email_notifications=True) | Q(user__preferences__isnull=True),
+        is_read=False,
+        emailed_at__isnull=True,
+        user__is_active=True,
+    )
+
+
+def _recipient_batches(batch_size):
+    """Yield lists of user ids with pending notifications, seeking by id."""
+    last_id = None
+    while True:
+        user_ids = _pending_notifications().order_by('user_id').values_list('user_id', flat=True)
+        if last_id is not None:
+            user_ids = user_ids.filter(user_id__gt=last_id)
+        batch = list(user_ids.distinct()[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def group_notifications(notifications):
+    """Group notification dicts by priority (most urgent first), then type."""
+    from .models import Notification
+
+    priority_labels = dict(Notification.Priority.choices)
+    type_labels = dict(Notification.NotificationType.choices)
+    grouped = defaultdict(lambda: defaultdict(list))
+    for notification in notifications:
+        grouped[notification['priority']][notification['notification_type']].append(notification)
+
+    return [
+        {
+            'priority': priority_labels.get(priority, priority),
+            'types': [
+                {'type': type_labels.get(kind, kind), 'notifications': items}
+                for kind, items in sorted(grouped[priority].items())
+            ],
+        }
+        for priority in PRIORITY_ORDER
+        if priority in grouped
+    ]
+
+
+def _build_digest(user, notifications, connection):
+    shown = notifications[:DIGEST_MAX_ITEMS]
+    return build_templated_email(
+        subject=f'You have {len(notifications)} unread notification(s)',
+        template_name='emails/notification_digest.html',
+        context={
+            'user': user,
+            'groups': group_notifications(shown),
+            'total': len(notifications),
+            'remaining': len(notifications) - len(shown),
+        },
+        recipient_list=[user.email],
+        connection=connection,
+    )
+
+
+def _send(connection, message):
+    """Send one email, logging (not raising) a failure."""
+    try:
+        return bool(connection.send_messages([message]))
+    except Exception as e:
+        logger.error(f'Failed to email {", ".join(message.to)}: {e}')
+        return False
+
+
+def send_digests(batch_size=DIGEST_BATCH_SIZE):
+    """
+    Email each eligible user a digest of their unread notifications.
+
+    Returns:
+        number of digests sent
+    """
+    from apps.accounts.models import User
+    from .models import Notification
+
+    sent = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        for user_ids in _recipient_batches(batch_size):
+            started_at = timezone.now()
+            by_user = defaultdict(list)
+            rows = (
+                _pending_notifications()
+                .filter(user_id__in=user_ids, created_at__lte=started_at)
+                .order_by('user_id', '-created_at')
+                .values('id', 'user_id', 'title', 'message', 'notification_type',
+                        'priority', 'action_url', 'created_at')
+            )
+            for row in rows:
+                by_user[row['user_id']].append(row)
+
+            users = User.objects.filter(id__in=by_user).only('id', 'email', 'full_name')
+            # Users whose digest failed stay unmarked so the next run retries them
+            delivered = [
+                user.id for user in users
+                if _send(connection, _build_digest(user, by_user[user.id], connection))
+            ]
+            if not delivered:
+                continue
+
+            Notification.objects.filter(
+                id__in=[row['id'] for user_id in delivered for row in by_user[user_id]]
+            ).update(emailed_at=started_at)
+            sent += len(delivered)
+    finally:
+        connection.close()
+
+    if sent:
+        logger.info(f'Sent {sent} notification digests')
+    return sent
+
+
+def email_offline(notifications):
+    """
+    Email urgent and high priority notifications immediately.
+
+    Meant for users without a live WebSocket connection; lower priorities
+    are left for the digest. Sent notifications are marked as emailed so
+    the digest does not repeat them.
+
+    Returns:
+        number of emails sent
+    """
+    from .models import Notification
+
+    ids = [n.id for n in notifications if n.priority in IMMEDIATE_PRIORITIES]
+    if not ids:
+        return 0
+    started_at = timezone.now()
+    pending = list(_pending_notifications().filter(id__in=ids).select_related('user'))
+    if not pending:
+        return 0
+
+    delivered = []
+    connection = get_connection()
+    try:
+        connection.open()
+        for notification in pending:
+            message = build_templated_email(
+                subject=notification.title,
+                template_name='emails/notification.html',
+                context={'user': notification.user, 'notification': notification},
+                recipient_list=[notification.user.email],
+                connection=connection,
+            )
+            # Failed ones stay unmarked, so the digest picks them up
+            if _send(connection, message):
+                delivered.append(notification.id)
+    except Exception as e:
+        logger.error(f'Failed to email {len(pending) - len(delivered)} notifications: {e}')
+    finally:
+        connection.close()
+
+    if delivered:
+        Notification.objects.filter(id__in=delivered).update(emailed_at=started_at)
+    return len(delivered)
@@ -0,0 +1,134 @@
+"""
+Bulk notification fan-out.
+
+A broadcast is split into chunks of user ids. Each chunk costs one query
+to resolve active users, one bulk INSERT for the notifications and one
+event loop pass that sends every WebSocket message concurrently. Only
+users with a live connection (see ``presence``) are pushed to; urgent
+notifications for everyone else are emailed by a separate task, so
+WebSocket delivery never waits on the mail server.
+"""
+
+import asyncio
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CHUNK_SIZE = getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 1000)
+# Concurrent channel-layer sends per batch
+GROUP_SEND_BATCH_SIZE = 200
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def notification_payload(notification):
+    """WebSocket representation of a notification."""
+    return {
+        'id': str(notification.id),
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'priority': notification.priority,
+        'action_url': notification.action_url,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def create_notifications(user_ids, title, message, notification_type='SYSTEM',
+                         priority='MEDIUM', data=None, action_url=''):
+    """
+    Create one notification per active user with a single bulk INSERT.
+
+    Returns:
+        the created notifications
+    """
+    from apps.accounts.models import User
+    from apps.analytics import counters
+    from .models import Notification
+
+    active_ids = list(
+        User.objects.filter(id__in=user_ids, is_active=True).values_list('id', flat=True)
+    )
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            priority=priority,
+            data=data,
+            action_url=action_url,
+        )
+        for user_id in active_ids
+    ])
+    # bulk_create skips post_save, so bump the unread counters directly
+    counters.increment_many(active_ids, counters.UNREAD_NOTIFICATIONS)
+    return notifications
+
+
+async def _group_send_many(channel_layer, messages):
+    for batch in chunked(messages, GROUP_SEND_BATCH_SIZE):
+        results = await asyncio.gather(
+            *(channel_layer.group_send(group, message) for group, message in batch),
+            return_exceptions=True,
+        )
+        failures = sum(isinstance(result, Exception) for result in results)
+        if failures:
+            logger.warning(f'{failures} of {len(batch)} notification pushes failed')
+
+
+def split_by_presence(notifications):
+    """Split notifications into (online, offline) by their user's presence."""
+    from . import presence
+
+    online_ids = presence.online_users({n.user_id for n in notifications})
+    online, offline = [], []
+    for notification in notifications:
+        (online if str(notification.user_id) in online_ids else offline).append(notification)
+    return online, offline
+
+
+def push_notifications(notifications):
+    """Send notifications to their users' WebSocket groups in concurrent batches."""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not notifications:
+        return
+    messages = [
+        (
+            f'notifications_{notification.user_id}',
+            {'type': 'notification_message', 'notification': notification_payload(notification)},
+        )
+        for notification in notifications
+    ]
+    async_to_sync(_group_send_many)(channel_layer, messages)
+
+
+def deliver_notifications(notifications):
+    """
+    Deliver created notifications: WebSocket for online users first, then
+    queue one ``email_offline_notifications`` task for the offline ones
+    (urgent and high priority only).
+    """
+    from .digests import IMMEDIATE_PRIORITIES
+    from .tasks import email_offline_notifications
+
+    if not notifications:
+        return
+    online, offline = split_by_presence(notifications)
+    try:
+        push_notifications(online)
+    except Exception as e:
+        # WebSocket delivery is best-effort
+        logger.warning(f'Failed to push {len(online)} notifications: {e}')
+
+    email_ids = [str(n.id) for n in offline if n.priority in IMMEDIATE_PRIORITIES]
+    if email_ids:
+        email_offline_notifications.delay(email_ids)
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="emailed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When this was included in an email digest",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("emailed_at__isnull", True), ("is_read", False)),
+                fields=["user"],
+                name="notifications_digest_pending",
+            ),
+        ),
+    ]
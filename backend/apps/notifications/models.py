@@ -46,6 +46,9 @@ class Notification(models.Model):
     data = models.JSONField(blank=True, null=True, help_text='Additional JSON data')
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(blank=True, null=True)
+    emailed_at = models.DateTimeField(
+        blank=True, null=True, help_text='When this was included in an email digest'
+    )
     action_url = models.CharField(max_length=500, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -56,13 +59,34 @@ class Notification(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_read']),
             models.Index(fields=['user', '-created_at']),
+            models.Index(
+                fields=['user'],
+                condition=models.Q(is_read=False, emailed_at__isnull=True),
+                name='notifications_digest_pending',
+            ),
         ]
 
     def __str__(self):
         return f'{self.title} - {self.user.email}'
 
     def mark_as_read(self):
+        """
+        Mark as read and decrement the user's unread counter.
+
+        The conditional UPDATE makes concurrent calls decrement only once.
+        """
+        from django.db import transaction
         from django.utils import timezone
+        from apps.analytics import counters
+
+        now = timezone.now()
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, read_at=now, updated_at=now,
+        )
         self.is_read = True
-        self.read_at = timezone.now()
-        self.save(update_fields=['is_read', 'read_at', 'updated_at'])
+        if updated:
+            self.read_at = self.updated_at = now
+            user_id = self.user_id
+            transaction.on_commit(
+                lambda: counters.increment(user_id, counters.UNREAD_NOTIFICATIONS, -1)
+            )
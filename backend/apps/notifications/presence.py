@@ -0,0 +1,101 @@
+"""
+WebSocket presence registry.
+
+Every open NotificationConsumer connection (one per browser tab) is
+recorded in a Redis sorted set per user (``presence:<id>``), keyed by
+channel name and scored by the time its registration expires. Consumers
+re-register every HEARTBEAT_INTERVAL seconds and unregister on
+disconnect, so connections that die without a clean disconnect drop out
+after PRESENCE_TTL. A user is online while any of their connections is
+unexpired.
+
+When the cache is not Redis, the same data is kept as a dict in the
+cache. If Redis is unavailable, users are reported online so delivery
+falls back to pushing to the channel layer.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from utils.cache import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'presence:'
+PRESENCE_TTL = getattr(settings, 'NOTIFICATION_PRESENCE_TTL', 90)
+HEARTBEAT_INTERVAL = getattr(settings, 'NOTIFICATION_HEARTBEAT_INTERVAL', 30)
+
+
+def _key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def register(user_id, channel_name):
+    """Record (or refresh) a live connection for a user."""
+    now = time.time()
+    redis = get_redis_connection()
+    if redis is None:
+        connections = {
+            channel: expires_at
+            for channel, expires_at in (cache.get(_key(user_id)) or {}).items()
+            if expires_at > now
+        }
+        connections[channel_name] = now + PRESENCE_TTL
+        cache.set(_key(user_id), connections, PRESENCE_TTL)
+        return
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.zremrangebyscore(_key(user_id), '-inf', now)
+        pipe.zadd(_key(user_id), {channel_name: now + PRESENCE_TTL})
+        pipe.expire(_key(user_id), PRESENCE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f'Failed to register presence for user {user_id}: {e}')
+
+
+def unregister(user_id, channel_name):
+    """Forget a connection; the user stays online while other tabs are open."""
+    redis = get_redis_connection()
+    if redis is None:
+        connections = cache.get(_key(user_id)) or {}
+        connections.pop(channel_name, None)
+        if connections:
+            cache.set(_key(user_id), connections, PRESENCE_TTL)
+        else:
+            cache.delete(_key(user_id))
+        return
+    try:
+        redis.zrem(_key(user_id), channel_name)
+    except Exception as e:
+        logger.warning(f'Failed to unregister presence for user {user_id}: {e}')
+
+
+def online_users(user_ids):
+    """Return the subset of ``user_ids`` (as strings) with a live connection."""
+    user_ids = [str(user_id) for user_id in user_ids]
+    if not user_ids:
+        return set()
+    now = time.time()
+    redis = get_redis_connection()
+    if redis is None:
+        entries = cache.get_many([_key(user_id) for user_id in user_ids])
+        return {
+            user_id for user_id in user_ids
+            if any(expires_at > now for expires_at in entries.get(_key(user_id), {}).values())
+        }
+    try:
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.zcount(_key(user_id), f'({now}', '+inf')
+        counts = pipe.execute()
+    except Exception as e:
+        logger.warning(f'Presence lookup failed, assuming users are online: {e}')
+        return set(user_ids)
+    return {user_id for user_id, count in zip(user_ids, counts) if count}
+
+
+def is_online(user_id):
+    return str(user_id) in online_users([user_id])
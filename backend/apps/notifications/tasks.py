@@ -6,10 +6,26 @@ from celery import shared_task
 from django.utils import timezone
 from datetime import timedelta
 
+from utils.deletion import DELETE_CHUNK_SIZE, delete_in_chunks
+from .delivery import queue_for
+from .fanout import (
+    FANOUT_CHUNK_SIZE,
+    chunked,
+    create_notifications,
+    deliver_notifications,
+)
+
 
 @shared_task(name='notifications.send_notification')
 def send_notification(user_id, title, message, notification_type='SYSTEM', priority='MEDIUM', data=None, action_url=''):
-    """Create a notification and send via WebSocket."""
+    """
+    Create a notification and send it via WebSocket, or by email if
+    the user is offline.
+
+    Queue through ``delivery.schedule_notification`` rather than calling
+    ``delay`` directly, so priority routing, rate limits and
+    deduplication apply.
+    """
     from .models import Notification
     from apps.accounts.models import User
 
@@ -28,55 +44,74 @@ def send_notification(user_id, title, message, notification_type='SYSTEM', prior
         action_url=action_url,
     )
 
-    # Send via WebSocket
-    try:
-        from channels.layers import get_channel_layer
-        from asgiref.sync import async_to_sync
-
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f'notifications_{user_id}',
-            {
-                'type': 'notification_message',
-                'notification': {
-                    'id': str(notification.id),
-                    'title': notification.title,
-                    'message': notification.message,
-                    'notification_type': notification.notification_type,
-                    'priority': notification.priority,
-                    'action_url': notification.action_url,
-                    'created_at': notification.created_at.isoformat(),
-                },
-            },
-        )
-    except Exception:
-        # WebSocket delivery is best-effort
-        pass
+    deliver_notifications([notification])
 
     return str(notification.id)
 
 
+@shared_task(name='notifications.email_offline_notifications')
+def email_offline_notifications(notification_ids):
+    """Email urgent and high priority notifications to offline users."""
+    from .digests import email_offline
+    from .models import Notification
+
+    return email_offline(list(Notification.objects.filter(id__in=notification_ids)))
+
+
 @shared_task(name='notifications.cleanup_old_notifications')
-def cleanup_old_notifications():
-    """Delete read notifications older than 30 days."""
+def cleanup_old_notifications(chunk_size=DELETE_CHUNK_SIZE):
+    """Delete read notifications older than 30 days in small batches."""
     from .models import Notification
 
+    # Only read notifications are removed, so unread counters are unaffected
     cutoff = timezone.now() - timedelta(days=30)
-    deleted_count, _ = Notification.objects.filter(
-        is_read=True, created_at__lt=cutoff
-    ).delete()
+    deleted_count = delete_in_chunks(
+        Notification.objects.filter(is_read=True, created_at__lt=cutoff),
+        chunk_size=chunk_size,
+    )
 
     return f'Deleted {deleted_count} old notifications.'
 
 
+@shared_task(name='notifications.send_notification_digests')
+def send_notification_digests():
+    """Email users a digest of their unread notifications."""
+    from .digests import send_digests
+
+    return f'Sent {send_digests()} notification digests.'
+
+
 @shared_task(name='notifications.send_bulk_notification')
-def send_bulk_notification(user_ids, title, message, notification_type='SYSTEM', priority='MEDIUM'):
-    """Send the same notification to multiple users."""
-    for user_id in user_ids:
-        send_notification.delay(
-            user_id=user_id,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            priority=priority,
+def send_bulk_notification(user_ids, title, message, notification_type='SYSTEM', priority='MEDIUM',
+                           data=None, action_url='', chunk_size=FANOUT_CHUNK_SIZE):
+    """Send the same notification to multiple users, one batch task per chunk."""
+    user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids)]
+    for chunk in chunked(user_ids, chunk_size):
+        send_notification_batch.apply_async(
+            kwargs={
+                'user_ids': chunk,
+                'title': title,
+                'message': message,
+                'notification_type': notification_type,
+                'priority': priority,
+                'data': data,
+                'action_url': action_url,
+            },
+            queue=queue_for(priority, bulk=True),
         )
+    return len(user_ids)
+
+
+@shared_task(name='notifications.send_notification_batch')
+def send_notification_batch(user_ids, title, message, notification_type='SYSTEM', priority='MEDIUM',
+                            data=None, action_url=''):
+    """Bulk-create one chunk of a broadcast and deliver it."""
+    notifications = create_notifications(
+        user_ids, title, message,
+        notification_type=notification_type,
+        priority=priority,
+        data=data,
+        action_url=action_url,
+    )
+    deliver_notifications(notifications)
+    return len(notifications)
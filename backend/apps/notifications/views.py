@@ -8,17 +8,21 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 
+from apps.analytics import counters
+from utils.pagination import KeysetPagination
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
 @extend_schema(tags=['Notifications'])
 class NotificationListView(generics.ListAPIView):
-    """List user's notifications."""
+    """List user's notifications, newest first, with keyset pagination."""
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     filterset_fields = ['notification_type', 'is_read', 'priority']
-    ordering_fields = ['created_at', 'priority']
+    # The feed order is fixed to (created_at, id) for keyset pagination
+    ordering_fields = []
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
@@ -64,6 +68,7 @@ class NotificationMarkAllReadView(APIView):
         count = Notification.objects.filter(
             user=request.user, is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        counters.set_counter(request.user.id, counters.UNREAD_NOTIFICATIONS, 0)
         return Response(
             {'success': True, 'message': f'{count} notification(s) marked as read.'},
             status=status.HTTP_200_OK,
@@ -82,6 +87,8 @@ class NotificationDeleteView(generics.DestroyAPIView):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.delete()
+        if not instance.is_read:
+            counters.increment(request.user.id, counters.UNREAD_NOTIFICATIONS, -1)
         return Response(
             {'success': True, 'message': 'Notification deleted.'},
             status=status.HTTP_204_NO_CONTENT,
@@ -94,9 +101,7 @@ class UnreadCountView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(
-            user=request.user, is_read=False
-        ).count()
+        count = counters.get_counter(request.user.id, counters.UNREAD_NOTIFICATIONS)
         return Response(
             {'success': True, 'data': {'unread_count': count}},
             status=status.HTTP_200_OK,
@@ -27,6 +27,46 @@ app.conf.beat_schedule = {
         'task': 'apps.notifications.tasks.cleanup_old_notifications',
         'schedule': crontab(minute=0, hour=1),  # Daily at 1 AM
     },
+    'send-notification-digests': {
+        'task': 'notifications.send_notification_digests',
+        'schedule': crontab(minute=0, hour=8),  # Daily at 8 AM
+    },
+    'snapshot-net-worth': {
+        'task': 'apps.financial_planning.tasks.snapshot_net_worth',
+        'schedule': crontab(minute=30, hour=2),  # Daily at 2:30 AM
+    },
+    'maintain-analytics-partitions': {
+        'task': 'apps.analytics.tasks.maintain_partitions',
+        'schedule': crontab(minute=0, hour=3),  # Daily at 3 AM
+    },
+    'flush-page-views': {
+        'task': 'apps.analytics.tasks.flush_page_views',
+        'schedule': 10.0,  # Every 10 seconds
+    },
+    'flush-audit-logs': {
+        'task': 'apps.analytics.tasks.flush_audit_logs',
+        'schedule': 10.0,  # Every 10 seconds
+    },
+    'rebuild-related-blog-posts': {
+        'task': 'apps.blog.tasks.rebuild_related_posts',
+        'schedule': crontab(minute=15, hour=4),  # Daily at 4:15 AM
+    },
+    'flush-blog-post-views': {
+        'task': 'apps.blog.tasks.flush_post_views',
+        'schedule': 30.0,  # Every 30 seconds
+    },
+    'rollup-page-views': {
+        'task': 'apps.analytics.tasks.rollup_page_views',
+        'schedule': crontab(minute=10),  # Hourly, after late events have landed
+    },
+    'refresh-dashboard-stats': {
+        'task': 'apps.analytics.tasks.refresh_dashboard_stats',
+        'schedule': 45.0,  # Before the 60 second cache TTL lapses
+    },
+    'reconcile-user-counters': {
+        'task': 'apps.analytics.tasks.reconcile_user_counters',
+        'schedule': crontab(minute=40),  # Hourly
+    },
 }
 
 
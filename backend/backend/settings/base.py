@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.analytics.middleware.AuditContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -209,6 +210,18 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
+CELERY_TASK_ROUTES = {
+    # Report rendering is CPU-heavy; keep it on its own worker pool
+    'apps.financial_planning.tasks.generate_plan_report': {'queue': 'reports'},
+    # Notifications get their own pools; schedule_notification picks the
+    # queue per priority and urgent ones go to notifications_urgent.
+    'notifications.send_notification': {'queue': 'notifications'},
+    'notifications.send_notification_batch': {'queue': 'notifications_bulk'},
+    # Offline emails wait on SMTP, so they never share a task with pushes
+    'notifications.email_offline_notifications': {'queue': 'notifications'},
+    'notifications.send_bulk_notification': {'queue': 'notifications_bulk'},
+    'notifications.send_notification_digests': {'queue': 'notifications_bulk'},
+}
 
 # Channels
 CHANNEL_LAYERS = {
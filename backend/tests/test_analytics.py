@@ -5,7 +5,7 @@ Tests for the analytics app.
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from apps.analytics.models import AuditLog, PageView
+from apps.analytics.models import AuditLog, PageView, PageViewRollup
 
 
 @pytest.mark.django_db
@@ -40,6 +40,15 @@ class TestAnalyticsAPI:
         assert response.status_code == status.HTTP_200_OK
         assert 'total_users' in response.data['data']
 
+    def test_dashboard_stats_cached(self, admin_client, django_assert_max_num_queries):
+        url = reverse('analytics:dashboard-stats')
+        first = admin_client.get(url)
+        assert first.data['data']['total_users'] == 1
+        # Served from the cache without touching the database
+        with django_assert_max_num_queries(0):
+            second = admin_client.get(url)
+        assert second.data == first.data
+
     def test_dashboard_stats_unauthorized(self, authenticated_client):
         url = reverse('analytics:dashboard-stats')
         response = authenticated_client.get(url)
@@ -51,14 +60,354 @@ class TestAnalyticsAPI:
         assert response.status_code == status.HTTP_200_OK
         assert 'total_consultations' in response.data['data']
 
+    def test_user_analytics_counters_follow_writes(
+        self, authenticated_client, user, django_capture_on_commit_callbacks
+    ):
+        from apps.financial_planning.models import FinancialPlan
+        url = reverse('analytics:user-analytics')
+        assert authenticated_client.get(url).data['data']['total_financial_plans'] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            plan = FinancialPlan.objects.create(user=user, title='Retirement')
+        assert authenticated_client.get(url).data['data']['total_financial_plans'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            plan.delete()
+        assert authenticated_client.get(url).data['data']['total_financial_plans'] == 0
+
     def test_track_page_view(self, api_client):
+        from apps.analytics.ingestion import flush_page_views
         url = reverse('analytics:track-page-view')
         data = {'path': '/services/'}
         response = api_client.post(url, data, format='json')
-        assert response.status_code == status.HTTP_201_CREATED
-        assert PageView.objects.count() == 1
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        # Page views are buffered until the flusher runs
+        assert PageView.objects.count() == 0
+        assert flush_page_views() == 1
+        assert PageView.objects.get().path == '/services/'
+
+    def test_flush_preserves_event_time_and_user(self, user):
+        from apps.analytics.ingestion import enqueue_page_view, flush_page_views
+        enqueue_page_view('/blog/', user_id=user.id, ip_address='10.0.0.1')
+        enqueue_page_view('/about/')
+        assert flush_page_views(batch_size=1) == 2
+        assert PageView.objects.filter(user=user, path='/blog/').exists()
+
+    def test_forged_ip_is_dropped_not_fatal(self, api_client):
+        from apps.analytics.ingestion import flush_page_views
+        url = reverse('analytics:track-page-view')
+        api_client.post(url, {'path': '/a/'}, format='json', HTTP_X_FORWARDED_FOR='junk')
+        api_client.post(url, {'path': '/b/'}, format='json', HTTP_X_FORWARDED_FOR='10.0.0.2')
+        assert flush_page_views() == 2
+        assert dict(PageView.objects.values_list('path', 'ip_address')) == {
+            '/a/': None, '/b/': '10.0.0.2',
+        }
+
+    def test_bad_event_is_dead_lettered_without_losing_batch(self):
+        from django.utils import timezone
+        from apps.analytics.ingestion import buffer, enqueue_page_view, flush_page_views
+        enqueue_page_view('/good/')
+        buffer.append({'created_at': timezone.now().isoformat()})  # no path
+        assert flush_page_views() == 1
+        assert PageView.objects.get().path == '/good/'
+        assert len(buffer._local_dead) == 1
+        buffer._local_dead.clear()
+
+    def test_batch_is_requeued_while_database_is_down(self, monkeypatch):
+        from django.db import OperationalError
+        from apps.analytics.ingestion import buffer, enqueue_page_view, flush_page_views
+        enqueue_page_view('/retry/')
+        writer = buffer.writer
+
+        def down(events):
+            raise OperationalError('connection refused')
+
+        monkeypatch.setattr(buffer, 'writer', down)
+        assert flush_page_views() == 0
+        monkeypatch.setattr(buffer, 'writer', writer)
+        assert flush_page_views() == 1
+        assert PageView.objects.get().path == '/retry/'
 
     def test_track_page_view_missing_path(self, api_client):
         url = reverse('analytics:track-page-view')
         response = api_client.post(url, {}, format='json')
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestConsultationTimeSeries:
+    """Tests for bucketed consultation analytics."""
+
+    def _consultation(self, user, created_at, **kwargs):
+        from apps.consultations.models import Consultation
+        consultation = Consultation.objects.create(
+            user=user, subject='Plan review', message='Hi', **kwargs
+        )
+        Consultation.objects.filter(pk=consultation.pk).update(created_at=created_at)
+        return consultation
+
+    def test_daily_buckets(self, admin_client, user, advisor_user):
+        from django.utils import timezone
+        today = timezone.localdate()
+        now = timezone.now()
+        self._consultation(user, now, status='COMPLETED', advisor=advisor_user,
+                           scheduled_date=now, duration=45)
+        self._consultation(user, now, status='PENDING')
+        self._consultation(user, now - timezone.timedelta(days=2), status='SCHEDULED')
+
+        response = admin_client.get(
+            reverse('analytics:consultation-timeseries'),
+            {'start': (today - timezone.timedelta(days=2)).isoformat(), 'end': today.isoformat()},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        buckets = response.data['data']
+        assert [b['volume']['total'] for b in buckets] == [1, 0, 2]
+        assert buckets[-1]['conversion']['completion_rate'] == 0.5
+        assert buckets[-1]['advisor_load'][0]['minutes'] == 45
+
+    def test_settled_buckets_are_not_recomputed(self, user):
+        from django.utils import timezone
+        from apps.analytics.timeseries import consultation_timeseries
+        old = timezone.localdate() - timezone.timedelta(days=30)
+        assert consultation_timeseries(old, old)[0]['volume']['total'] == 0
+        self._consultation(user, timezone.make_aware(
+            timezone.datetime.combine(old, timezone.datetime.min.time())
+        ))
+        assert consultation_timeseries(old, old)[0]['volume']['total'] == 0
+
+    def test_late_completion_reaches_settled_cohort(self, user, django_capture_on_commit_callbacks):
+        from django.utils import timezone
+        from apps.analytics.timeseries import consultation_timeseries
+        old = timezone.localdate() - timezone.timedelta(days=30)
+        consultation = self._consultation(user, timezone.make_aware(
+            timezone.datetime.combine(old, timezone.datetime.min.time())
+        ), status='SCHEDULED')
+        consultation.refresh_from_db()
+        assert consultation_timeseries(old, old)[0]['conversion']['completed'] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            consultation.status = 'COMPLETED'
+            consultation.save()
+        assert consultation_timeseries(old, old)[0]['conversion']['completed'] == 1
+
+    def test_weekly_buckets_start_on_monday(self):
+        from datetime import date
+        from apps.analytics.timeseries import WEEK, bucket_range
+        assert bucket_range(date(2026, 10, 15), date(2026, 10, 26), WEEK) == [
+            date(2026, 10, 12), date(2026, 10, 19), date(2026, 10, 26),
+        ]
+
+
+@pytest.mark.django_db
+class TestPageViewRollups:
+    """Tests for incremental page view rollups."""
+
+    def _page_views(self, user):
+        from datetime import datetime
+        from django.utils import timezone
+        base = timezone.make_aware(datetime(2026, 3, 1, 10, 0))
+        for minutes, path, ip in [(5, '/a/', '1.1.1.1'), (20, '/a/', '1.1.1.1'),
+                                  (30, '/a/', '2.2.2.2'), (70, '/b/', '1.1.1.1')]:
+            PageView.objects.create(
+                path=path, ip_address=ip,
+                created_at=base + timezone.timedelta(minutes=minutes),
+            )
+        PageView.objects.create(
+            path='/a/', user=user, ip_address='1.1.1.1',
+            created_at=base + timezone.timedelta(minutes=40),
+        )
+        return base
+
+    def test_rollup_is_incremental(self, user):
+        from django.utils import timezone
+        from apps.analytics.rollups import rollup_page_views
+        base = self._page_views(user)
+
+        rollup_page_views(now=base + timezone.timedelta(hours=1, minutes=10))
+        hour = PageViewRollup.objects.get(granularity='HOUR', path='/a/')
+        assert (hour.views, hour.unique_visitors) == (4, 3)
+        # The 11:00 hour is not complete yet
+        assert not PageViewRollup.objects.filter(path='/b/').exists()
+
+        rollup_page_views(now=base + timezone.timedelta(days=1))
+        assert PageViewRollup.objects.filter(granularity='HOUR').count() == 2
+        day = PageViewRollup.objects.get(granularity='DAY', path='/a/')
+        assert (day.views, day.unique_visitors) == (4, 3)
+        # Re-running does not double count
+        rollup_page_views(now=base + timezone.timedelta(days=1))
+        assert PageViewRollup.objects.get(granularity='HOUR', path='/a/').views == 4
+
+    def test_top_pages_and_trend(self, admin_client, user):
+        from django.utils import timezone
+        from apps.analytics.rollups import rollup_page_views
+        base = self._page_views(user)
+        rollup_page_views(now=base + timezone.timedelta(days=2))
+
+        response = admin_client.get(reverse('analytics:page-view-top'), {'granularity': 'HOUR'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['path'] for row in response.data['data']] == ['/a/', '/b/']
+        assert response.data['data'][0]['unique_visitors'] == 3
+
+        response = admin_client.get(
+            reverse('analytics:page-view-trend'), {'granularity': 'HOUR', 'path': '/b/'}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['data'][0]['views'] == 1
+
+
+@pytest.mark.django_db
+class TestAuditLogging:
+    """Tests for buffered audit logging."""
+
+    def test_api_changes_are_audited(
+        self, authenticated_client, user, django_capture_on_commit_callbacks
+    ):
+        from apps.analytics.audit import flush_audit_logs
+        url = reverse('investments:portfolio-list')
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_client.post(url, {'name': 'Growth'}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        # Audit events are buffered until the flusher runs
+        assert AuditLog.objects.count() == 0
+        assert flush_audit_logs() == 1
+
+        log = AuditLog.objects.get()
+        assert log.user == user
+        assert log.action == AuditLog.ActionType.CREATE
+        assert log.resource_type == 'Portfolio'
+        assert log.resource_id == str(user.portfolios.get().id)
+
+    def test_changes_outside_requests_are_not_audited(self, user):
+        from apps.analytics.audit import flush_audit_logs
+        from apps.investments.models import Portfolio
+        Portfolio.objects.create(user=user, name='Background')
+        assert flush_audit_logs() == 0
+
+    def test_forged_ip_does_not_lose_other_events(self, user):
+        from django.test import RequestFactory
+        from apps.analytics.audit import flush_audit_logs, record
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='<script>')
+        record(AuditLog.ActionType.DOWNLOAD, 'Document', 'a', user=user, request=request)
+        record(AuditLog.ActionType.DOWNLOAD, 'Document', 'b', user=user)
+        assert flush_audit_logs() == 2
+        assert AuditLog.objects.get(resource_id='a').ip_address is None
+
+    def test_record_explicit_event(self, user):
+        from apps.analytics.audit import flush_audit_logs, record
+        record(AuditLog.ActionType.DOWNLOAD, 'Document', 'abc', user=user)
+        assert flush_audit_logs() == 1
+        assert AuditLog.objects.get().action == AuditLog.ActionType.DOWNLOAD
+
+    def test_list_defaults_to_recent_window(self, admin_client, user):
+        from django.utils import timezone
+        AuditLog.objects.create(user=user, action='VIEW', resource_type='Document')
+        AuditLog.objects.create(
+            user=user, action='VIEW', resource_type='Document',
+            created_at=timezone.now() - timezone.timedelta(days=90),
+        )
+        url = reverse('analytics:audit-log-list')
+        response = admin_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 1
+
+        start = (timezone.now() - timezone.timedelta(days=120)).isoformat()
+        response = admin_client.get(url, {'start': start})
+        assert len(response.data['results']) == 2
+
+    def test_list_pages_by_created_at_and_id(self, admin_client, user):
+        from django.utils import timezone
+        created_at = timezone.now()
+        logs = [
+            AuditLog.objects.create(
+                user=user, action='VIEW', resource_type='Document', created_at=created_at,
+            )
+            for _ in range(3)
+        ]
+        url = reverse('analytics:audit-log-list')
+        first = admin_client.get(url, {'page_size': 2})
+        second = admin_client.get(first.data['next'])
+        ids = [row['id'] for row in first.data['results'] + second.data['results']]
+        assert ids == sorted((str(log.id) for log in logs), reverse=True)
+        assert second.data['next'] is None
+
+    def test_export_streams_filtered_rows(self, admin_client, user):
+        import csv
+        import io
+        import json
+        AuditLog.objects.create(user=user, action='CREATE', resource_type='Portfolio')
+        AuditLog.objects.create(
+            user=user, action='DOWNLOAD', resource_type='Document', metadata={'size': 1},
+        )
+        url = reverse('analytics:audit-log-export')
+
+        response = admin_client.get(url, {'action': 'DOWNLOAD'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        assert len(rows) == 1
+        assert rows[0]['user__email'] == user.email
+        assert json.loads(rows[0]['metadata']) == {'size': 1}
+
+        response = admin_client.get(url, {'export_format': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert {json.loads(line)['action'] for line in lines} == {'CREATE', 'DOWNLOAD'}
+
+    def test_export_has_no_default_window(self, admin_client, user):
+        from django.utils import timezone
+        AuditLog.objects.create(user=user, action='VIEW', resource_type='Document')
+        AuditLog.objects.create(
+            user=user, action='VIEW', resource_type='Document',
+            created_at=timezone.now() - timezone.timedelta(days=90),
+        )
+        response = admin_client.get(reverse('analytics:audit-log-export'))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 3
+
+    def test_export_requires_admin(self, authenticated_client):
+        response = authenticated_client.get(reverse('analytics:audit-log-export'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestPartitions:
+    """Tests for partition maintenance and retention."""
+
+    def test_month_arithmetic(self):
+        from datetime import datetime, timezone as dt_timezone
+        from apps.analytics.partitions import add_months, month_start, partition_name
+        month = month_start(datetime(2026, 12, 15, 8, tzinfo=dt_timezone.utc))
+        assert month == datetime(2026, 12, 1, tzinfo=dt_timezone.utc)
+        assert add_months(month, 1) == datetime(2027, 1, 1, tzinfo=dt_timezone.utc)
+        assert add_months(month, -12) == datetime(2025, 12, 1, tzinfo=dt_timezone.utc)
+        assert partition_name('page_views', month) == 'page_views_p202612'
+
+    def test_retention_without_partitioning_deletes_expired_rows(self):
+        from django.utils import timezone
+        from apps.analytics.partitions import drop_expired_partitions
+        now = timezone.now()
+        PageView.objects.create(path='/old/', created_at=now - timezone.timedelta(days=400))
+        PageView.objects.create(path='/new/')
+        assert drop_expired_partitions('page_views', now=now) == 1
+        assert list(PageView.objects.values_list('path', flat=True)) == ['/new/']
+
+
+class TestHyperLogLog:
+    """Tests for the HyperLogLog sketch."""
+
+    def test_estimate_and_merge(self):
+        from utils.hyperloglog import HyperLogLog
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            first.add(f'visitor-{i}')
+            second.add(f'visitor-{i + 1500}')
+        assert first.count() == pytest.approx(3000, rel=0.05)
+        merged = HyperLogLog.from_bytes(first.to_bytes()).merge(second)
+        assert merged.count() == pytest.approx(4500, rel=0.05)
+
+    def test_sparse_roundtrip(self):
+        from utils.hyperloglog import HyperLogLog
+        sketch = HyperLogLog()
+        sketch.add('a')
+        data = sketch.to_bytes()
+        assert len(data) < 10
+        assert HyperLogLog.from_bytes(data).count() == 1
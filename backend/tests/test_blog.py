@@ -69,3 +69,288 @@ class TestBlogAPI:
         url = reverse('blog:blog-categories')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_200_OK
+
+    def test_tag_counts_are_annotated_and_published_only(
+        self, api_client, admin_user, django_assert_num_queries
+    ):
+        tags = [Tag.objects.create(name=f'Tag {i}') for i in range(5)]
+        for i, post_status in enumerate(['PUBLISHED', 'PUBLISHED', 'DRAFT']):
+            post = BlogPost.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='Content',
+                author=admin_user, status=post_status,
+            )
+            post.tags.set(tags)
+
+        url = reverse('blog:blog-tags')
+        # Page count + page, regardless of the number of tags
+        with django_assert_num_queries(2):
+            response = api_client.get(url)
+        assert [tag['posts_count'] for tag in response.data['results']] == [2] * 5
+
+    def test_post_list_tags_have_no_counts(
+        self, api_client, admin_user, django_assert_max_num_queries
+    ):
+        tags = [Tag.objects.create(name=f'Tag {i}') for i in range(3)]
+        for i in range(10):
+            post = BlogPost.objects.create(
+                title=f'Post {i}', slug=f'post-{i}', content='Content',
+                author=admin_user, status='PUBLISHED',
+            )
+            post.tags.set(tags)
+
+        with django_assert_max_num_queries(4):
+            response = api_client.get(reverse('blog:blog-post-list'))
+        assert 'posts_count' not in response.data['results'][0]['tags'][0]
+
+    def test_views_are_buffered_until_flushed(self, api_client, admin_user):
+        from apps.blog.view_counts import flush_views
+        post = BlogPost.objects.create(
+            title='Popular', slug='popular', content='Content',
+            author=admin_user, status='PUBLISHED',
+        )
+        url = reverse('blog:blog-post-increment-view', kwargs={'slug': post.slug})
+        for _ in range(3):
+            assert api_client.post(url).status_code == status.HTTP_200_OK
+        missing = reverse('blog:blog-post-increment-view', kwargs={'slug': 'missing'})
+        assert api_client.post(missing).status_code == status.HTTP_404_NOT_FOUND
+
+        post.refresh_from_db()
+        assert post.views == 0
+        assert flush_views() == 1
+        post.refresh_from_db()
+        assert post.views == 3
+        assert flush_views() == 0
+
+    def test_draft_views_are_not_counted(self, api_client, admin_user):
+        from apps.blog.view_counts import flush_views
+        post = BlogPost.objects.create(
+            title='Draft', slug='draft', content='Content', author=admin_user, status='DRAFT',
+        )
+        url = reverse('blog:blog-post-increment-view', kwargs={'slug': post.slug})
+        assert api_client.post(url).status_code == status.HTTP_404_NOT_FOUND
+
+        post.status = 'PUBLISHED'
+        post.save()
+        assert api_client.post(url).status_code == status.HTTP_200_OK
+        assert flush_views() == 1
+
+    def test_local_views_flush_from_their_own_process(self, admin_user, monkeypatch):
+        from apps.blog import view_counts
+        for slug in ('local', 'other'):
+            BlogPost.objects.create(
+                title=slug, slug=slug, content='Content', author=admin_user, status='PUBLISHED',
+            )
+        view_counts._take_pending()
+        started = []
+
+        class Thread:
+            def __init__(self, target, daemon):
+                self.target = target
+
+            def start(self):
+                started.append(self.target)
+
+        monkeypatch.setattr(view_counts.threading, 'Thread', Thread)
+        monkeypatch.setattr(view_counts, 'LOCAL_FLUSH_THRESHOLD', 2)
+        view_counts.record_view('local')
+        view_counts.record_view('local')
+        assert started == []
+        view_counts.record_view('other')
+        assert started == [view_counts._flush_local]
+        view_counts._take_pending()
+
+    def test_views_flush_in_slices(self, admin_user, monkeypatch):
+        from apps.blog import view_counts
+        monkeypatch.setattr(view_counts, 'FLUSH_SLICE_SIZE', 2)
+        for index in range(5):
+            BlogPost.objects.create(
+                title=f'Post {index}', slug=f'post-{index}', content='Content',
+                author=admin_user, status='PUBLISHED',
+            )
+            view_counts.record_view(f'post-{index}')
+        assert view_counts.flush_views() == 5
+        assert set(BlogPost.objects.values_list('views', flat=True)) == {1}
+
+    def test_search_ranks_title_matches_first(self, api_client, admin_user):
+        BlogPost.objects.create(
+            title='Saving for retirement', slug='content-match', excerpt='Plan ahead',
+            content='A budget helps. Start budgeting early.', author=admin_user, status='PUBLISHED',
+        )
+        BlogPost.objects.create(
+            title='Budget basics', slug='title-match', excerpt='Where money goes',
+            content='Track spending every month.', author=admin_user, status='PUBLISHED',
+        )
+        BlogPost.objects.create(
+            title='Investing', slug='no-match', excerpt='Stocks',
+            content='Index funds.', author=admin_user, status='PUBLISHED',
+        )
+        url = reverse('blog:blog-post-list')
+        response = api_client.get(url, {'search': 'budget'})
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [post['slug'] for post in results] == ['title-match', 'content-match']
+        assert '<mark>' in results[1]['search_snippet']
+
+    def test_search_index_follows_edits(
+        self, api_client, admin_user, django_capture_on_commit_callbacks
+    ):
+        post = BlogPost.objects.create(
+            title='Old title', slug='edited', excerpt='Excerpt',
+            content='Content', author=admin_user, status='PUBLISHED',
+        )
+        post.title = 'Emergency fund'
+        post.save()
+        url = reverse('blog:blog-post-list')
+        assert len(api_client.get(url, {'search': 'emergency'}).data['results']) == 1
+        assert len(api_client.get(url, {'search': 'old'}).data['results']) == 0
+        with django_capture_on_commit_callbacks(execute=True):
+            post.delete()
+        assert len(api_client.get(url, {'search': 'emergency'}).data['results']) == 0
+
+
+@pytest.mark.django_db
+class TestBlogResponseCache:
+    """Tests for cached public blog responses."""
+
+    def _post(self, author, **kwargs):
+        defaults = {
+            'title': 'Cached', 'slug': 'cached', 'content': 'Content',
+            'author': author, 'status': 'PUBLISHED',
+        }
+        defaults.update(kwargs)
+        return BlogPost.objects.create(**defaults)
+
+    def test_repeat_list_is_served_from_cache(
+        self, api_client, admin_user, django_assert_num_queries
+    ):
+        self._post(admin_user)
+        url = reverse('blog:blog-post-list')
+        first = api_client.get(url)
+        with django_assert_num_queries(0):
+            second = api_client.get(url)
+        assert second.data == first.data
+        assert second['ETag'] == first['ETag']
+        assert 'Last-Modified' in second
+
+    def test_conditional_get_returns_not_modified(self, api_client, admin_user):
+        post = self._post(admin_user)
+        url = reverse('blog:blog-post-detail', kwargs={'slug': post.slug})
+        etag = api_client.get(url)['ETag']
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_tag_change_invalidates(
+        self, api_client, admin_user, django_capture_on_commit_callbacks
+    ):
+        post = self._post(admin_user)
+        url = reverse('blog:blog-post-detail', kwargs={'slug': post.slug})
+        etag = api_client.get(url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.tags.add(Tag.objects.create(name='Budgeting'))
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert [tag['name'] for tag in response.data['tags']] == ['Budgeting']
+
+    def test_unknown_params_share_cache_entry(
+        self, api_client, admin_user, django_assert_num_queries
+    ):
+        self._post(admin_user)
+        url = reverse('blog:blog-post-list')
+        api_client.get(url, {'is_featured': 'false', 'search': 'cached'})
+        with django_assert_num_queries(0):
+            response = api_client.get(url, {'_': '123', 'search': 'cached', 'is_featured': 'false'})
+        assert response.data['count'] == 1
+
+    def test_invalidation_waits_for_commit(self, api_client, admin_user):
+        from unittest import mock
+        from apps.blog import caching
+        post = self._post(admin_user)
+        url = reverse('blog:blog-post-detail', kwargs={'slug': post.slug})
+        etag = api_client.get(url)['ETag']
+
+        with mock.patch.object(caching, '_bump_generation') as bump:
+            post.title = 'Renamed'
+            post.save()
+        # The test transaction never commits, so nothing was invalidated yet
+        bump.assert_not_called()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+class TestRelatedPosts:
+    """Tests for the related-posts index."""
+
+    def _post(self, author, slug, content, **kwargs):
+        return BlogPost.objects.create(
+            title=slug.replace('-', ' ').title(), slug=slug, content=content,
+            author=author, status='PUBLISHED', **kwargs
+        )
+
+    def test_related_posts_follow_tags_category_and_text(
+        self, api_client, admin_user, django_capture_on_commit_callbacks
+    ):
+        category = Category.objects.create(name='Retirement', slug='retirement')
+        tag = Tag.objects.create(name='Pensions')
+        with django_capture_on_commit_callbacks(execute=True):
+            base = self._post(admin_user, 'pension-basics', 'Pension contributions grow tax free.',
+                              category=category)
+            base.tags.add(tag)
+            close = self._post(admin_user, 'pension-top-ups', 'Topping up pension contributions.',
+                               category=category)
+            close.tags.add(tag)
+            loose = self._post(admin_user, 'tax-free-savings', 'Savings that grow tax free.')
+            self._post(admin_user, 'car-loans', 'Comparing interest on vehicle finance.')
+
+        url = reverse('blog:blog-post-detail', kwargs={'slug': base.slug})
+        related = [post['slug'] for post in api_client.get(url).data['related_posts']]
+        assert related == [close.slug, loose.slug]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            close.status = 'DRAFT'
+            close.save()
+        related = [post['slug'] for post in api_client.get(url).data['related_posts']]
+        assert related == [loose.slug]
+
+    def test_update_only_tokenizes_the_changed_post(
+        self, admin_user, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        from apps.blog import related
+        with django_capture_on_commit_callbacks(execute=True):
+            posts = [
+                self._post(admin_user, f'topic-{i}', content)
+                for i, content in enumerate(['Emergency fund basics.', 'Pension planning.',
+                                             'Mortgage payments.', 'Student loans.'])
+            ]
+
+        calls = []
+        tokenize = related.tokenize
+        monkeypatch.setattr(related, 'tokenize', lambda text: calls.append(text) or tokenize(text))
+        with django_capture_on_commit_callbacks(execute=True):
+            posts[0].content = 'Emergency fund before pension planning.'
+            posts[0].save()
+        assert len(calls) == 1
+        assert [entry.related_id for entry in posts[1].related_entries.all()] == [posts[0].pk]
+
+    def test_deleted_post_leaves_the_corpus(self, admin_user, django_capture_on_commit_callbacks):
+        from apps.blog.related import load_corpus
+        with django_capture_on_commit_callbacks(execute=True):
+            kept = self._post(admin_user, 'saving-tips', 'Saving tips for a rainy day.')
+            removed = self._post(admin_user, 'saving-more', 'More saving tips for a rainy day.')
+        assert set(load_corpus().posts) == {kept.pk, removed.pk}
+
+        removed_pk = removed.pk
+        with django_capture_on_commit_callbacks(execute=True):
+            removed.delete()
+        assert set(load_corpus().posts) == {kept.pk}
+        assert removed_pk not in load_corpus().candidates(kept.pk)
+
+    def test_concurrent_update_waits_for_lock(self, admin_user, monkeypatch):
+        from django.core.cache import cache
+        from apps.blog import related
+        post = self._post(admin_user, 'locked', 'Content')
+        monkeypatch.setattr(related, 'LOCK_WAIT', 0)
+        cache.add(related.LOCK_KEY, 1)
+        with pytest.raises(related.CorpusBusy):
+            related.update_related_posts(post.pk)
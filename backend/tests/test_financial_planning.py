@@ -5,13 +5,13 @@ Tests for the financial planning app.
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from apps.financial_planning.models import FinancialPlan
+from apps.financial_planning.models import FinancialPlan, NetWorthSnapshot
 from apps.financial_planning.calculators import (
-    compound_interest_calculator,
-    retirement_calculator,
-    loan_payment_calculator,
-    investment_growth_calculator,
-    tax_calculator,
+    calculate_compound_interest,
+    calculate_retirement_needs,
+    calculate_loan_payment,
+    project_investment_growth,
+    estimate_tax,
 )
 
 
@@ -37,25 +37,187 @@ class TestFinancialPlanModel:
         assert plan.net_worth == 0
 
 
+@pytest.mark.django_db
+class TestFinancialPlanList:
+    """Tests for the plan listing endpoint."""
+
+    def test_list_annotates_counts(self, authenticated_client, user, django_assert_max_num_queries):
+        for i in range(3):
+            plan = FinancialPlan.objects.create(user=user, title=f'Plan {i}')
+            plan.goals.create(
+                name='Goal', category='OTHER', target_amount=100, target_date='2030-01-01',
+            )
+            plan.incomes.create(source='Salary', amount=100, frequency='MONTHLY')
+        url = reverse('financial-plan-list')
+        with django_assert_max_num_queries(3):
+            response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert {r['goals_count'] for r in results} == {1}
+        assert {r['incomes_count'] for r in results} == {1}
+        assert results[0]['total_income'] == '100.00'
+
+    def test_admin_listing_uses_keyset_pagination(self, admin_client, user):
+        for i in range(12):
+            FinancialPlan.objects.create(user=user, title=f'Plan {i}')
+        url = reverse('financial-plan-all-plans')
+        response = admin_client.get(url, {'page_size': 10})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert len(response.data['results']) == 10
+        next_page = admin_client.get(response.data['next'])
+        assert len(next_page.data['results']) == 2
+
+        response = admin_client.get(url, {'ordering': 'title'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_has_one_shape_for_every_role(self, admin_user, user):
+        from rest_framework.test import APIClient
+        FinancialPlan.objects.create(user=user, title='Plan')
+        url = reverse('financial-plan-list')
+        for member in (admin_user, user):
+            client = APIClient()
+            client.force_authenticate(member)
+            response = client.get(url, {'ordering': 'title'})
+            assert response.data['count'] == 1
+
+    def test_admin_listing_is_admin_only(self, authenticated_client):
+        response = authenticated_client.get(reverse('financial-plan-all-plans'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestNetWorthSnapshots:
+    """Tests for net worth snapshots and history."""
+
+    def _plan_with_totals(self, user):
+        plan = FinancialPlan.objects.create(user=user, title='Snapshot Plan')
+        plan.incomes.create(source='Salary', amount=1200, frequency='ANNUAL')
+        plan.expenses.create(category='Rent', amount=50, frequency='MONTHLY')
+        plan.assets.create(
+            asset_type='Cash', description='Savings', value=5000,
+            acquisition_date='2024-01-01',
+        )
+        plan.liabilities.create(
+            liability_type='Loan', description='Car', amount=2000, interest_rate=5,
+        )
+        return plan
+
+    def test_with_totals_matches_properties(self, user):
+        plan = self._plan_with_totals(user)
+        annotated = FinancialPlan.objects.with_totals().get(pk=plan.pk)
+        assert annotated.income_sum == plan.total_income
+        assert annotated.expense_sum == plan.total_expenses
+        assert annotated.asset_sum - annotated.liability_sum == plan.net_worth
+
+    def test_with_totals_does_not_truncate_annual_amounts(self, user):
+        from decimal import Decimal
+        plan = FinancialPlan.objects.create(user=user, title='Uneven Plan')
+        plan.incomes.create(source='Bonus', amount=1000, frequency='ANNUAL')
+        plan.incomes.create(source='Interest', amount=Decimal('10.50'), frequency='MONTHLY')
+        annotated = FinancialPlan.objects.with_totals().get(pk=plan.pk)
+        assert round(annotated.income_sum, 2) == round(plan.total_income, 2) == Decimal('93.83')
+
+    def test_snapshot_task_is_idempotent(self, user):
+        from apps.financial_planning.tasks import snapshot_net_worth
+        plan = self._plan_with_totals(user)
+        FinancialPlan.objects.create(user=user, title='Empty Plan')
+        snapshot_net_worth()
+        snapshot_net_worth()
+        assert NetWorthSnapshot.objects.count() == 2
+        assert NetWorthSnapshot.objects.get(plan=plan).net_worth == 3000
+
+    def test_net_worth_history_downsampled(self, authenticated_client, user):
+        plan = self._plan_with_totals(user)
+        for day, value in [(1, 100), (2, 200), (20, 400)]:
+            NetWorthSnapshot.objects.create(
+                plan=plan, snapshot_date=f'2026-03-{day:02d}',
+                total_income=0, total_expenses=0, total_assets=value,
+                total_liabilities=0, net_worth=value,
+            )
+        url = reverse('financial-plan-net-worth-history', args=[plan.pk])
+        response = authenticated_client.get(url, {'interval': 'month'})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['data']) == 1
+        assert float(response.data['data'][0]['net_worth']) == pytest.approx(233.33)
+
+        response = authenticated_client.get(url, {'start': '2026-03-02'})
+        assert [p['snapshot_date'] for p in response.data['data']] == ['2026-03-02', '2026-03-20']
+
+
+@pytest.mark.django_db
+class TestPlanReports:
+    """Tests for plan report generation."""
+
+    @pytest.mark.parametrize('report_format', ['pdf', 'xlsx'])
+    def test_report_creates_document_and_notification(
+        self, authenticated_client, user, settings, tmp_path, report_format
+    ):
+        from apps.documents.models import Document
+        from apps.notifications.models import Notification
+
+        settings.MEDIA_ROOT = tmp_path
+        plan = FinancialPlan.objects.create(user=user, title='Report Plan')
+        plan.goals.create(
+            name='House', category='HOME', target_amount=1000, target_date='2030-01-01',
+        )
+        url = reverse('financial-plan-report', args=[plan.pk])
+        response = authenticated_client.post(url, {'format': report_format}, format='json')
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        document = Document.objects.get(user=user)
+        assert document.category == Document.Category.REPORT
+        assert document.file_type == f'.{report_format}'
+        assert document.file_size > 0
+        assert Notification.objects.filter(user=user, notification_type='DOCUMENT').exists()
+
+    def test_pdf_escapes_markup_in_title(self, user, settings, tmp_path):
+        from apps.financial_planning.reports import generate_plan_report
+
+        settings.MEDIA_ROOT = tmp_path
+        FinancialPlan.objects.create(user=user, title='Savings <2030> & beyond')
+        plan = FinancialPlan.objects.with_totals().get(user=user)
+        document = generate_plan_report(plan, 'pdf')
+        assert document.file_size > 0
+
+    def test_batch_queues_one_task_per_plan(self, admin_client, user, settings, tmp_path):
+        from apps.documents.models import Document
+
+        settings.MEDIA_ROOT = tmp_path
+        plans = [FinancialPlan.objects.create(user=user, title=f'Plan {i}') for i in range(3)]
+        url = reverse('financial-plan-reports-batch')
+        response = admin_client.post(
+            url, {'plan_ids': [str(plan.pk) for plan in plans], 'format': 'xlsx'}, format='json'
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert Document.objects.filter(user=user).count() == 3
+
+    def test_batch_requires_advisor(self, authenticated_client):
+        url = reverse('financial-plan-reports-batch')
+        response = authenticated_client.post(url, {'plan_ids': []}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 class TestCalculators:
     """Tests for financial calculators."""
 
     def test_compound_interest(self):
-        result = compound_interest_calculator(
+        result = calculate_compound_interest(
             principal=10000,
             annual_rate=10,
             years=5,
-            compounds_per_year=12,
+            compounding_frequency=12,
         )
-        assert 'future_value' in result
-        assert result['future_value'] > 10000
+        assert 'final_amount' in result
+        assert result['final_amount'] > 10000
         assert 'total_interest' in result
 
     def test_retirement_calculator(self):
-        result = retirement_calculator(
+        result = calculate_retirement_needs(
             current_age=30,
             retirement_age=60,
-            monthly_expenses=50000,
+            life_expectancy=85,
+            annual_expenses=600000,
             inflation_rate=6,
             expected_return=12,
         )
@@ -63,7 +225,7 @@ class TestCalculators:
         assert result['corpus_needed'] > 0
 
     def test_loan_payment(self):
-        result = loan_payment_calculator(
+        result = calculate_loan_payment(
             principal=1000000,
             annual_rate=8,
             years=20,
@@ -73,20 +235,20 @@ class TestCalculators:
         assert 'total_payment' in result
 
     def test_investment_growth(self):
-        result = investment_growth_calculator(
+        result = project_investment_growth(
             initial_investment=100000,
             monthly_contribution=10000,
             annual_return=12,
             years=10,
         )
-        assert 'future_value' in result
-        assert result['future_value'] > 100000
+        assert 'final_value' in result
+        assert result['final_value'] > 100000
 
     def test_tax_calculator(self):
-        result = tax_calculator(annual_income=1000000)
-        assert 'tax_amount' in result
+        result = estimate_tax(annual_income=1000000)
+        assert 'total_tax' in result
         assert 'effective_rate' in result
-        assert result['tax_amount'] >= 0
+        assert result['total_tax'] >= 0
 
 
 @pytest.mark.django_db
@@ -99,7 +261,7 @@ class TestCalculatorAPI:
             'principal': 10000,
             'annual_rate': 10,
             'years': 5,
-            'compounds_per_year': 12,
+            'compounding_frequency': 12,
         }
         response = api_client.post(url, data, format='json')
         assert response.status_code == status.HTTP_200_OK
@@ -66,7 +66,367 @@ class TestNotificationAPI:
         assert response.status_code == status.HTTP_200_OK
         assert Notification.objects.filter(user=user, is_read=False).count() == 0
 
+    def test_unread_count_follows_writes(
+        self, authenticated_client, user, django_capture_on_commit_callbacks
+    ):
+        url = reverse('notifications:notification-unread-count')
+        assert authenticated_client.get(url).data['data']['unread_count'] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first = Notification.objects.create(user=user, title='N1', message='M1')
+            Notification.objects.create(user=user, title='N2', message='M2')
+        assert authenticated_client.get(url).data['data']['unread_count'] == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first.mark_as_read()
+        assert authenticated_client.get(url).data['data']['unread_count'] == 1
+
+        authenticated_client.post(reverse('notifications:notification-mark-all-read'))
+        assert authenticated_client.get(url).data['data']['unread_count'] == 0
+
+    def test_unread_count_decrements_once(
+        self, authenticated_client, user, django_capture_on_commit_callbacks
+    ):
+        url = reverse('notifications:notification-unread-count')
+        with django_capture_on_commit_callbacks(execute=True):
+            first = Notification.objects.create(user=user, title='N1', message='M1')
+            second = Notification.objects.create(user=user, title='N2', message='M2')
+            third = Notification.objects.create(user=user, title='N3', message='M3')
+        assert authenticated_client.get(url).data['data']['unread_count'] == 3
+
+        stale = Notification.objects.get(pk=first.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            first.mark_as_read()
+            stale.mark_as_read()
+        assert authenticated_client.get(url).data['data']['unread_count'] == 2
+
+        delete_url = reverse('notifications:notification-delete', kwargs={'id': second.id})
+        authenticated_client.delete(delete_url)
+        assert authenticated_client.get(url).data['data']['unread_count'] == 1
+        assert Notification.objects.filter(user=user, is_read=False).get() == third
+
     def test_notifications_unauthorized(self, api_client):
         url = reverse('notifications:notification-list')
         response = api_client.get(url)
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestBulkNotifications:
+    """Tests for bulk notification fan-out."""
+
+    def test_bulk_notification_creates_rows_per_active_user(self, create_user):
+        from apps.notifications.tasks import send_bulk_notification
+        users = [create_user(email=f'user{i}@example.com') for i in range(3)]
+        inactive = create_user(email='inactive@example.com', is_active=False)
+        user_ids = [u.id for u in users] + [inactive.id, users[0].id]
+
+        assert send_bulk_notification(user_ids, 'Maintenance', 'Tonight', chunk_size=2) == 4
+        assert Notification.objects.count() == 3
+        assert not Notification.objects.filter(user=inactive).exists()
+
+    def test_batch_updates_unread_count_and_pushes(self, authenticated_client, user):
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+        from apps.notifications import presence
+        from apps.notifications.tasks import send_notification_batch
+
+        url = reverse('notifications:notification-unread-count')
+        assert authenticated_client.get(url).data['data']['unread_count'] == 0
+
+        channel_layer = get_channel_layer()
+        channel = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(f'notifications_{user.id}', channel)
+        presence.register(user.id, channel)
+
+        assert send_notification_batch([str(user.id)], 'Hello', 'World') == 1
+        message = async_to_sync(channel_layer.receive)(channel)
+        assert message['notification']['title'] == 'Hello'
+        assert authenticated_client.get(url).data['data']['unread_count'] == 1
+
+
+@pytest.mark.django_db
+class TestNotificationPagination:
+    """Tests for keyset pagination of the notification feed."""
+
+    def _create(self, user, count):
+        from django.utils import timezone
+        now = timezone.now()
+        notifications = Notification.objects.bulk_create([
+            Notification(user=user, title=f'N{i}', message='M') for i in range(count)
+        ])
+        # Give half of them the same timestamp to exercise the id tie-break
+        for i, notification in enumerate(notifications):
+            Notification.objects.filter(pk=notification.pk).update(
+                created_at=now - timezone.timedelta(minutes=i // 2)
+            )
+
+    def test_pages_cover_feed_without_gaps(self, authenticated_client, user):
+        self._create(user, 7)
+        url = reverse('notifications:notification-list')
+        seen = []
+        response = authenticated_client.get(url, {'page_size': 3})
+        assert 'count' not in response.data
+        while True:
+            seen += [item['id'] for item in response.data['results']]
+            if not response.data['next']:
+                break
+            response = authenticated_client.get(response.data['next'])
+        expected = Notification.objects.filter(user=user).order_by('-created_at', '-id')
+        assert seen == [str(pk) for pk in expected.values_list('id', flat=True)]
+
+    def test_since_returns_only_new_items(self, authenticated_client, user):
+        self._create(user, 2)
+        url = reverse('notifications:notification-list')
+        since = authenticated_client.get(url).data['since']
+
+        assert authenticated_client.get(url, {'since': since}).data['results'] == []
+        new = Notification.objects.create(user=user, title='New', message='M')
+        response = authenticated_client.get(url, {'since': since})
+        assert [item['id'] for item in response.data['results']] == [str(new.id)]
+        assert response.data['has_more'] is False
+
+    def test_invalid_cursor(self, authenticated_client):
+        url = reverse('notifications:notification-list')
+        response = authenticated_client.get(url, {'cursor': 'bogus'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestNotificationCleanup:
+    """Tests for chunked notification cleanup."""
+
+    def test_cleanup_deletes_old_read_notifications_in_chunks(self, user):
+        from django.utils import timezone
+        from apps.notifications.tasks import cleanup_old_notifications
+        old = timezone.now() - timezone.timedelta(days=40)
+        for i in range(5):
+            Notification.objects.create(user=user, title=f'Old {i}', message='M', is_read=True)
+        Notification.objects.create(user=user, title='Old unread', message='M')
+        Notification.objects.update(created_at=old)
+        Notification.objects.create(user=user, title='Recent', message='M', is_read=True)
+
+        assert cleanup_old_notifications(chunk_size=2) == 'Deleted 5 old notifications.'
+        assert set(Notification.objects.values_list('title', flat=True)) == {'Old unread', 'Recent'}
+
+    def test_delete_in_chunks_reports_progress(self, user):
+        from utils.deletion import delete_in_chunks
+        for i in range(5):
+            Notification.objects.create(user=user, title=f'N{i}', message='M')
+        progress = []
+        deleted = delete_in_chunks(
+            Notification.objects.all(), chunk_size=2, sleep=0, progress=progress.append,
+        )
+        assert deleted == 5
+        assert progress == [2, 4, 5]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNotificationConsumer:
+    """Tests for notification frame coalescing in the WebSocket consumer."""
+
+    def _burst(self, user, count):
+        import asyncio
+        import json
+        from asgiref.sync import async_to_sync
+        from apps.notifications.consumers import NotificationConsumer
+
+        frames = []
+
+        async def send(text_data):
+            frames.append(json.loads(text_data))
+
+        async def run():
+            consumer = NotificationConsumer()
+            consumer.user = user
+            consumer.send = send
+            for i in range(count):
+                await consumer.notification_message({
+                    'type': 'notification_message',
+                    'notification': {'id': str(i), 'title': f'N{i}'},
+                })
+            await asyncio.wait_for(consumer.flush_task, timeout=2)
+
+        async_to_sync(run)()
+        return frames
+
+    def test_burst_is_coalesced_into_one_frame(self, user):
+        frames = self._burst(user, 5)
+        assert len(frames) == 1
+        assert frames[0]['type'] == 'notifications'
+        assert [n['title'] for n in frames[0]['notifications']] == ['N0', 'N1', 'N2', 'N3', 'N4']
+        assert frames[0]['dropped'] == 0
+        assert frames[0]['unread_count'] == 0
+
+    def test_queue_depth_is_capped(self, user):
+        from apps.notifications.consumers import MAX_PENDING
+        frames = self._burst(user, MAX_PENDING + 10)
+        assert len(frames) == 1
+        assert len(frames[0]['notifications']) == MAX_PENDING
+        assert frames[0]['dropped'] == 10
+        assert frames[0]['notifications'][-1]['title'] == f'N{MAX_PENDING + 9}'
+
+
+@pytest.mark.django_db
+class TestNotificationPresence:
+    """Tests for the presence registry and offline delivery."""
+
+    def test_user_online_until_last_connection_closes(self, user):
+        from apps.notifications import presence
+
+        presence.register(user.id, 'tab-1')
+        presence.register(user.id, 'tab-2')
+        presence.unregister(user.id, 'tab-1')
+        assert presence.is_online(user.id)
+        presence.unregister(user.id, 'tab-2')
+        assert not presence.is_online(user.id)
+
+    def test_expired_connection_is_offline(self, user, monkeypatch):
+        from apps.notifications import presence
+
+        presence.register(user.id, 'tab-1')
+        monkeypatch.setattr(presence.time, 'time', lambda: 10 ** 12)
+        assert not presence.is_online(user.id)
+
+    def test_offline_user_is_emailed_instead_of_pushed(self, user, monkeypatch):
+        from django.core import mail
+        from apps.notifications import fanout
+        from apps.notifications.tasks import send_notification
+
+        pushed = []
+        monkeypatch.setattr(fanout, 'push_notifications', pushed.extend)
+
+        send_notification(str(user.id), 'Payment failed', 'Check your card', priority='URGENT')
+        send_notification(str(user.id), 'Tip', 'Save more', priority='LOW')
+
+        assert pushed == []
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == 'Payment failed'
+        # Only the low priority one is left for the digest
+        assert list(
+            Notification.objects.filter(emailed_at__isnull=True).values_list('title', flat=True)
+        ) == ['Tip']
+
+    def test_offline_emails_are_queued_after_pushes(self, user, create_user, monkeypatch):
+        from unittest import mock
+        from apps.notifications import fanout, presence
+        from apps.notifications.tasks import email_offline_notifications
+
+        online = create_user(email='online@example.com')
+        presence.register(online.id, 'tab-1')
+        events = []
+        monkeypatch.setattr(fanout, 'push_notifications', lambda items: events.append('push'))
+        with mock.patch.object(email_offline_notifications, 'delay') as delay:
+            delay.side_effect = lambda ids: events.append('email')
+            notifications = fanout.create_notifications(
+                [user.id, online.id], 'Payment failed', 'M', priority='URGENT'
+            )
+            fanout.deliver_notifications(notifications)
+
+        assert events == ['push', 'email']
+        offline_ids = [str(n.id) for n in notifications if n.user_id == user.id]
+        delay.assert_called_once_with(offline_ids)
+
+    def test_online_user_is_pushed(self, user, monkeypatch):
+        from django.core import mail
+        from apps.notifications import fanout, presence
+        from apps.notifications.tasks import send_notification
+
+        pushed = []
+        monkeypatch.setattr(fanout, 'push_notifications', pushed.extend)
+        presence.register(user.id, 'tab-1')
+
+        send_notification(str(user.id), 'Payment failed', 'Check your card', priority='URGENT')
+
+        assert [n.title for n in pushed] == ['Payment failed']
+        assert mail.outbox == []
+
+
+@pytest.mark.django_db
+class TestNotificationDigests:
+    """Tests for unread notification email digests."""
+
+    def test_digest_groups_unread_and_respects_preferences(self, create_user):
+        from django.core import mail
+        from apps.accounts.models import UserPreferences
+        from apps.notifications.digests import send_digests
+
+        subscribed = create_user(email='digest@example.com')
+        opted_out = create_user(email='optout@example.com')
+        UserPreferences.objects.update_or_create(
+            user=opted_out, defaults={'email_notifications': False}
+        )
+        Notification.objects.create(user=subscribed, title='Alert', message='M', priority='URGENT')
+        Notification.objects.create(user=subscribed, title='Tip', message='M', priority='LOW')
+        Notification.objects.create(user=subscribed, title='Seen', message='M', is_read=True)
+        Notification.objects.create(user=opted_out, title='Alert', message='M')
+
+        assert send_digests(batch_size=1) == 1
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['digest@example.com']
+        body = mail.outbox[0].body
+        assert body.index('Alert') < body.index('Tip')
+        assert 'Seen' not in body
+
+        # Already emailed notifications are not sent again
+        assert send_digests() == 0
+
+    def test_failed_recipient_does_not_block_others(self, create_user, monkeypatch):
+        from django.core import mail
+        from django.core.mail.backends.locmem import EmailBackend
+        from apps.notifications.digests import send_digests
+
+        delivered = create_user(email='ok@example.com')
+        rejected = create_user(email='bounce@example.com')
+        Notification.objects.create(user=delivered, title='Alert', message='M')
+        Notification.objects.create(user=rejected, title='Alert', message='M')
+
+        send_messages = EmailBackend.send_messages
+
+        def reject_bounces(backend, messages):
+            if any('bounce@example.com' in message.to for message in messages):
+                raise ConnectionError('Recipient refused')
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', reject_bounces)
+        assert send_digests() == 1
+        assert [message.to for message in mail.outbox] == [['ok@example.com']]
+        pending = Notification.objects.filter(emailed_at__isnull=True)
+        assert list(pending.values_list('user__email', flat=True)) == ['bounce@example.com']
+
+
+@pytest.mark.django_db
+class TestNotificationDelivery:
+    """Tests for notification routing, rate limiting and deduplication."""
+
+    def test_priority_routes_to_queue(self):
+        from apps.notifications.delivery import BULK_QUEUE, DEFAULT_QUEUE, URGENT_QUEUE, queue_for
+
+        assert queue_for('URGENT') == URGENT_QUEUE
+        assert queue_for('MEDIUM') == DEFAULT_QUEUE
+        assert queue_for('MEDIUM', bulk=True) == BULK_QUEUE
+        assert queue_for('HIGH') == DEFAULT_QUEUE
+        assert queue_for('HIGH', bulk=True) == BULK_QUEUE
+        assert queue_for('URGENT', bulk=True) == BULK_QUEUE
+
+    def test_duplicate_notification_is_dropped(self, user):
+        from apps.notifications.delivery import schedule_notification
+
+        assert schedule_notification(user.id, 'Report ready', 'Done') is not None
+        assert schedule_notification(user.id, 'Report ready', 'Done') is None
+        assert Notification.objects.filter(user=user).count() == 1
+
+    def test_rate_limit_defers_non_urgent(self, user, monkeypatch):
+        from unittest import mock
+        from apps.notifications import delivery
+        from apps.notifications.tasks import send_notification
+
+        monkeypatch.setattr(delivery, 'RATE_LIMIT', 2)
+        with mock.patch.object(send_notification, 'apply_async') as apply_async:
+            for i in range(3):
+                delivery.schedule_notification(user.id, f'N{i}', 'M')
+            delivery.schedule_notification(user.id, 'Alert', 'M', priority='URGENT')
+
+        countdowns = [call.kwargs['countdown'] for call in apply_async.call_args_list]
+        assert countdowns == [None, None, delivery.RATE_WINDOW, None]
+        assert apply_async.call_args_list[-1].kwargs['queue'] == delivery.URGENT_QUEUE
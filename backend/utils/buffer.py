@@ -0,0 +1,223 @@
+"""
+Write-behind event buffers.
+
+Request handlers append small JSON events to a buffer and a periodic
+task drains it in batches. The buffer is a Redis list when the default
+cache is Redis, otherwise an in-process ring buffer.
+
+A batch that fails to write is never silently dropped: if the database
+is unreachable the batch is put back at the head of the buffer for the
+next flush; otherwise the batch is retried row by row and only the rows
+that still fail are moved to a dead-letter list (``<key>:dead``).
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from django.db import InterfaceError, OperationalError, transaction
+
+from utils.cache import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the database (not the event) is the problem
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+
+class EventBuffer:
+    """
+    Buffer of JSON events written to the database in batches.
+
+    The in-process fallback is only visible to the process that filled
+    it, so the periodic flush task (running in a Celery worker) cannot
+    drain it. Instead the owning process flushes it from a background
+    thread once it holds ``flush_threshold`` events or its oldest event
+    is ``flush_interval`` seconds old.
+
+    Args:
+        key: Redis list holding the events
+        writer: callable receiving a list of decoded events and returning
+            the number of rows written
+        batch_size: events drained (and written) per batch
+        local_size: capacity of the in-process fallback buffer; the oldest
+            events are dropped if it overflows between flushes
+        flush_threshold: local buffer length that triggers a background flush
+        flush_interval: age in seconds of the oldest local event that
+            triggers a background flush
+        dead_letter_size: failed events kept in the dead-letter list
+    """
+
+    def __init__(self, key, writer, batch_size=1000, local_size=10000, flush_threshold=200,
+                 flush_interval=10, dead_letter_size=10000):
+        self.key = key
+        self.dead_letter_key = f'{key}:dead'
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_threshold = flush_threshold
+        self.flush_interval = flush_interval
+        self.dead_letter_size = dead_letter_size
+        self._local = deque(maxlen=local_size)
+        self._local_dead = deque(maxlen=dead_letter_size)
+        self._oldest_local = None
+        self._flush_lock = threading.Lock()
+
+    def append(self, event):
+        raw = json.dumps(event, default=str)
+
+        redis = get_redis_connection()
+        if redis is not None:
+            try:
+                redis.rpush(self.key, raw)
+                return
+            except Exception as e:
+                logger.warning(f'Redis unavailable for {self.key}, buffering locally: {e}')
+
+        now = time.monotonic()
+        if not self._local:
+            self._oldest_local = now
+        self._local.append(raw)
+        due = (
+            len(self._local) >= self.flush_threshold
+            or now - (self._oldest_local or now) >= self.flush_interval
+        )
+        if due and not self._flush_lock.locked():
+            threading.Thread(target=self._flush_local, daemon=True).start()
+
+    def drain(self, batch_size):
+        """Atomically remove and return up to ``batch_size`` raw events."""
+        events = []
+        redis = get_redis_connection()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=True)
+                pipe.lrange(self.key, 0, batch_size - 1)
+                pipe.ltrim(self.key, batch_size, -1)
+                events, _ = pipe.execute()
+            except Exception as e:
+                logger.warning(f'Failed to drain {self.key} from Redis: {e}')
+
+        while len(events) < batch_size:
+            try:
+                events.append(self._local.popleft())
+            except IndexError:
+                break
+        return events
+
+    def requeue(self, raw_events):
+        """Put drained events back at the head of the buffer, in order."""
+        if not raw_events:
+            return
+        redis = get_redis_connection()
+        if redis is not None:
+            try:
+                redis.lpush(self.key, *reversed(raw_events))
+                return
+            except Exception as e:
+                logger.warning(f'Failed to requeue {self.key} events to Redis: {e}')
+        self._local.extendleft(reversed(raw_events))
+
+    def dead_letter(self, raw_events):
+        """Keep events that cannot be written for inspection."""
+        if not raw_events:
+            return
+        logger.error(f'Moving {len(raw_events)} unwritable events to {self.dead_letter_key}')
+        redis = get_redis_connection()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.rpush(self.dead_letter_key, *raw_events)
+                pipe.ltrim(self.dead_letter_key, -self.dead_letter_size, -1)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f'Failed to dead-letter {self.key} events to Redis: {e}')
+        self._local_dead.extend(raw_events)
+
+    def flush(self, batch_size=None, max_batches=100):
+        """
+        Drain buffered events into the database.
+
+        Stops early (leaving the rest buffered) if the database is
+        unavailable.
+
+        Returns:
+            number of rows written
+        """
+        batch_size = batch_size or self.batch_size
+        written = 0
+        for _ in range(max_batches):
+            raw_events = self.drain(batch_size)
+            if not raw_events:
+                break
+            batch_written, complete = self._write_batch(raw_events)
+            written += batch_written
+            if not complete or len(raw_events) < batch_size:
+                break
+        return written
+
+    def _write_batch(self, raw_events):
+        """
+        Write one drained batch.
+
+        Returns:
+            ``(rows written, whether the batch was fully handled)``
+        """
+        events, malformed = self._decode(raw_events)
+        self.dead_letter(malformed)
+        if not events:
+            return 0, True
+
+        try:
+            with transaction.atomic():
+                return self.writer([event for _, event in events]), True
+        except TRANSIENT_ERRORS as e:
+            logger.warning(f'Database unavailable, requeueing {len(events)} {self.key} events: {e}')
+            self.requeue([raw for raw, _ in events])
+            return 0, False
+        except Exception as e:
+            logger.warning(f'Batch write for {self.key} failed, retrying row by row: {e}')
+
+        written = 0
+        failed = []
+        for index, (raw, event) in enumerate(events):
+            try:
+                with transaction.atomic():
+                    written += self.writer([event])
+            except TRANSIENT_ERRORS as e:
+                logger.warning(f'Database unavailable, requeueing {self.key} events: {e}')
+                self.requeue([raw for raw, _ in events[index:]])
+                self.dead_letter(failed)
+                return written, False
+            except Exception as e:
+                logger.warning(f'Failed to write {self.key} event {raw!r}: {e}')
+                failed.append(raw)
+        self.dead_letter(failed)
+        return written, True
+
+    def _decode(self, raw_events):
+        """Split raw events into ``(raw, event)`` pairs and undecodable raws."""
+        events, malformed = [], []
+        for raw in raw_events:
+            try:
+                events.append((raw, json.loads(raw)))
+            except (TypeError, ValueError):
+                malformed.append(raw)
+        return events, malformed
+
+    def _flush_local(self):
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            from django.db import connection
+            try:
+                self.flush()
+            finally:
+                connection.close()
+        except Exception as e:
+            logger.error(f'Failed to flush local {self.key} buffer: {e}')
+        finally:
+            self._oldest_local = time.monotonic() if self._local else None
+            self._flush_lock.release()
@@ -0,0 +1,71 @@
+"""
+Cache and Redis helpers.
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def get_redis_connection(alias='default'):
+    """
+    Return the raw Redis client behind a django-redis cache.
+
+    Returns None when the cache is not Redis-backed (e.g. LocMemCache in
+    development and tests), so callers can fall back to a local strategy.
+    """
+    try:
+        from django_redis import get_redis_connection as _get_redis_connection
+        return _get_redis_connection(alias)
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def get_or_compute(key, compute, ttl, stale_ttl=None, lock_timeout=30, wait=2.0):
+    """
+    Return a cached value, recomputing it with stampede protection.
+
+    Values are stored with a soft expiry of ``ttl`` seconds and kept for
+    ``stale_ttl`` more seconds. Once the soft expiry passes, the first
+    caller to take the lock recomputes while everyone else keeps getting
+    the stale value. On a cold cache, callers that miss the lock wait up
+    to ``wait`` seconds for the winner before computing themselves.
+    """
+    stale_ttl = stale_ttl if stale_ttl is not None else ttl * 5
+    lock_key = f'{key}:lock'
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at = entry
+        if expires_at > time.time() or not cache.add(lock_key, 1, lock_timeout):
+            return value
+        return _recompute(key, lock_key, compute, ttl, stale_ttl)
+
+    if cache.add(lock_key, 1, lock_timeout):
+        return _recompute(key, lock_key, compute, ttl, stale_ttl)
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return compute()
+
+
+def set_computed(key, value, ttl, stale_ttl=None):
+    """Store a value in the format used by ``get_or_compute``."""
+    stale_ttl = stale_ttl if stale_ttl is not None else ttl * 5
+    cache.set(key, (value, time.time() + ttl), ttl + stale_ttl)
+
+
+def _recompute(key, lock_key, compute, ttl, stale_ttl):
+    try:
+        value = compute()
+        set_computed(key, value, ttl, stale_ttl)
+        return value
+    finally:
+        cache.delete(lock_key)
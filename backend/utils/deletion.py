@@ -0,0 +1,64 @@
+"""
+Chunked deletion for retention jobs.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = getattr(settings, 'RETENTION_DELETE_CHUNK_SIZE', 1000)
+DELETE_CHUNK_SLEEP = getattr(settings, 'RETENTION_DELETE_CHUNK_SLEEP', 0.1)
+
+
+def delete_in_chunks(queryset, chunk_size=DELETE_CHUNK_SIZE, sleep=DELETE_CHUNK_SLEEP,
+                     max_chunks=None, progress=None):
+    """
+    Delete the rows matched by ``queryset`` in primary-key batches.
+
+    Each batch selects up to ``chunk_size`` primary keys and deletes them
+    in its own short transaction, then sleeps for ``sleep`` seconds, so
+    locks are held briefly and foreground writes interleave with the job
+    instead of waiting behind one long DELETE. Only one batch of keys is
+    held in memory at a time.
+
+    Args:
+        queryset: rows to delete
+        chunk_size: rows per batch
+        sleep: seconds to pause between batches
+        max_chunks: stop after this many batches (None for no limit);
+            the remaining rows are picked up by the next run
+        progress: optional callable receiving the running total after
+            each batch
+
+    Returns:
+        number of rows deleted (cascaded rows are not counted)
+    """
+    model = queryset.model
+    label = model._meta.label
+    keys = queryset.order_by().values_list('pk', flat=True)
+
+    total = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        pks = list(keys[:chunk_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            _, per_model = model._base_manager.filter(pk__in=pks).delete()
+        total += per_model.get(label, 0)
+        chunks += 1
+        logger.debug(f'Deleted {total} {label} rows so far')
+        if progress is not None:
+            progress(total)
+        if len(pks) < chunk_size:
+            break
+        if sleep:
+            time.sleep(sleep)
+
+    if total:
+        logger.info(f'Deleted {total} {label} rows in {chunks} chunk(s)')
+    return total
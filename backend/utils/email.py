@@ -11,6 +11,32 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def build_templated_email(subject, template_name, context, recipient_list, from_email=None,
+                          connection=None):
+    """
+    Render an HTML email from a template without sending it.
+
+    Useful for sending many messages over one connection with
+    ``connection.send_messages``.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    context.setdefault('frontend_url', settings.FRONTEND_URL)
+    context.setdefault('company_name', "grow O'Clock")
+
+    html_content = render_to_string(template_name, context)
+    text_content = strip_tags(html_content)
+
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=from_email,
+        to=recipient_list,
+        connection=connection,
+    )
+    msg.attach_alternative(html_content, 'text/html')
+    return msg
+
+
 def send_templated_email(subject, template_name, context, recipient_list, from_email=None):
     """
     Send an HTML email using a template.
@@ -22,21 +48,8 @@ def send_templated_email(subject, template_name, context, recipient_list, from_e
         recipient_list: List of recipient email addresses
         from_email: Sender email (defaults to DEFAULT_FROM_EMAIL)
     """
-    from_email = from_email or settings.DEFAULT_FROM_EMAIL
-    context.setdefault('frontend_url', settings.FRONTEND_URL)
-    context.setdefault('company_name', "grow O'Clock")
-
     try:
-        html_content = render_to_string(template_name, context)
-        text_content = strip_tags(html_content)
-
-        msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=from_email,
-            to=recipient_list,
-        )
-        msg.attach_alternative(html_content, 'text/html')
+        msg = build_templated_email(subject, template_name, context, recipient_list, from_email)
         msg.send()
         logger.info(f'Email sent successfully to {recipient_list}')
         return True
@@ -0,0 +1,82 @@
+"""
+Pure-Python HyperLogLog sketch for approximate distinct counting.
+"""
+
+import hashlib
+import math
+
+DEFAULT_PRECISION = 12  # 4096 registers, ~1.6% standard error
+
+_DENSE = b'D'
+_SPARSE = b'S'
+
+
+class HyperLogLog:
+    """
+    Fixed-size sketch estimating the number of distinct values added.
+
+    Sketches with the same precision can be merged, so per-bucket sketches
+    can be combined into totals for any range of buckets without going
+    back to the raw data. ``to_bytes`` uses a sparse encoding while few
+    registers are set, which keeps low-traffic buckets small.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        x = int.from_bytes(digest, 'big')
+        index = x >> (64 - self.precision)
+        remaining = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Merge ``other`` into this sketch in place."""
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge sketches with different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    def to_bytes(self):
+        nonzero = [(i, r) for i, r in enumerate(self.registers) if r]
+        header = bytes([self.precision])
+        if len(nonzero) * 3 < self.m:
+            return _SPARSE + header + b''.join(
+                i.to_bytes(2, 'big') + bytes([r]) for i, r in nonzero
+            )
+        return _DENSE + header + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data, precision=DEFAULT_PRECISION):
+        """Load a sketch; empty data yields an empty sketch."""
+        data = bytes(data or b'')
+        if not data:
+            return cls(precision)
+        kind, precision, body = data[:1], data[1], data[2:]
+        if kind == _DENSE:
+            return cls(precision, bytearray(body))
+        sketch = cls(precision)
+        for offset in range(0, len(body), 3):
+            index = int.from_bytes(body[offset:offset + 2], 'big')
+            sketch.registers[index] = body[offset + 2]
+        return sketch
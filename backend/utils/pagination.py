@@ -2,8 +2,15 @@
 Custom pagination classes for the API.
 """
 
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -28,3 +35,122 @@ class LargeResultsSetPagination(PageNumberPagination):
     page_size = 25
     page_size_query_param = 'page_size'
     max_page_size = 200
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Each page seeks past the last row of the previous one with
+    ``(created_at, id) < (ts, id)``, so pages cost O(page size) at any
+    depth, ties on created_at are never skipped or repeated, and no
+    COUNT(*) is run.
+
+    Polling: pass the ``since`` token from a previous response to get
+    only rows newer than it (oldest first within the batch, returned
+    newest first). ``has_more`` says whether another poll is needed to
+    catch up.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    since_query_param = 'since'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.since = None
+        since = request.query_params.get(self.since_query_param)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if since:
+            created_at, pk = self.decode_token(since, queryset.model)
+            rows = list(
+                queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+                .order_by('created_at', 'pk')[:self.page_size + 1]
+            )
+            self.has_more = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+            rows.reverse()
+            self.since = self.encode_token(rows[0]) if rows else since
+            self.next_token = None
+            return rows
+
+        if cursor:
+            created_at, pk = self.decode_token(cursor, queryset.model)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        rows = list(queryset.order_by('-created_at', '-pk')[:self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_token = self.encode_token(rows[-1]) if self.has_more else None
+        if rows and not cursor:
+            self.since = self.encode_token(rows[0])
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_token(self, instance):
+        raw = f'{instance.created_at.isoformat()}|{instance.pk}'
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_token(self, token, model):
+        try:
+            created_at, pk = urlsafe_b64decode(token.encode()).decode().split('|', 1)
+            created_at = parse_datetime(created_at)
+            pk = model._meta.pk.to_python(pk)
+        except (TypeError, ValueError, UnicodeDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def get_next_link(self):
+        if self.next_token is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.since_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_token)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'since': self.since,
+            'has_more': self.has_more,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'since': {'type': 'string', 'nullable': True},
+                'has_more': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'description': description,
+                'schema': {'type': schema_type},
+            }
+            for name, schema_type, description in [
+                (self.cursor_query_param, 'string', 'Token for the next (older) page.'),
+                (self.since_query_param, 'string', 'Return only items newer than this token.'),
+                (self.page_size_query_param, 'integer', 'Number of results per page.'),
+            ]
+        ]
@@ -2,6 +2,7 @@
 Custom validators for the API.
 """
 
+import ipaddress
 import re
 from django.core.exceptions import ValidationError
 from django.conf import settings
@@ -66,3 +67,13 @@ def validate_percentage(value):
     """Validate percentage value (0-100)."""
     if value < 0 or value > 100:
         raise ValidationError('Percentage must be between 0 and 100.')
+
+
+def normalize_ip(value):
+    """Return ``value`` as a canonical IP address string, or None if it is not one."""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None